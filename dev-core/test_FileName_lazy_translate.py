@@ -0,0 +1,56 @@
+#!/usr/bin/python3 -B
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2016-2022 Wintermute0110 <wintermute0110@gmail.com>
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; version 2 of the License.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# Test that FileName translates special:// paths only when the path is used.
+
+# --- Import AEL modules ---
+import os, sys
+if __name__ == "__main__" and __package__ is None:
+    path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+    print('Adding to sys.path {0}'.format(path))
+    sys.path.append(path)
+import resources.utils as utils
+
+# --- Fake xbmcvfs module that records the translatePath() calls ---
+class FakeXbmcvfs(object):
+    def __init__(self):
+        self.calls = []
+
+    def translatePath(self, path_str):
+        self.calls.append(path_str)
+        return path_str.replace('special://x', '/home/kodi/x')
+
+# --- main ---------------------------------------------------------------------------------------
+fake_xbmcvfs = FakeXbmcvfs()
+utils.xbmcvfs = fake_xbmcvfs
+
+parent_FN = utils.FileName('special://x')
+child_FN = parent_FN.pjoin('a')
+assert fake_xbmcvfs.calls == [], fake_xbmcvfs.calls
+assert child_FN.getOriginalPath() == os.path.join('special://x', 'a')
+assert fake_xbmcvfs.calls == [], fake_xbmcvfs.calls
+
+assert child_FN.getPath() == os.path.join('/home/kodi/x', 'a'), child_FN.getPath()
+assert fake_xbmcvfs.calls == [os.path.join('special://x', 'a')], fake_xbmcvfs.calls
+
+# The translated path is cached.
+child_FN.getPath()
+assert len(fake_xbmcvfs.calls) == 1, fake_xbmcvfs.calls
+
+# Children of a translated parent are not translated again.
+grandchild_FN = child_FN.pjoin('b.json')
+assert grandchild_FN.getPath() == os.path.join('/home/kodi/x', 'a', 'b.json')
+assert len(fake_xbmcvfs.calls) == 1, fake_xbmcvfs.calls
+print('All tests passed')
+sys.exit(0)
@@ -5,8 +5,10 @@
 # AEL modules.
 import resources.const as const
 import resources.misc as misc
+import resources.utils as utils
 
 # Python standard library.
+import dataclasses
 import sys
 
 settings = {
@@ -28,29 +30,48 @@ settings = {
 }
 
 # --- Test data -----------------------------------------------------------------------------------
+# Iterating a Game returns (search_term, rombase, platform) like the old tuples did.
+# dataclass(slots = True) needs Python 3.10, __slots__ is declared by hand instead.
+@dataclasses.dataclass(frozen = True)
+class Game:
+    __slots__ = ('search_term', 'rombase', 'platform')
+    search_term: str
+    rombase: str
+    platform: str
+
+    def __iter__(self):
+        return iter((self.search_term, self.rombase, self.platform))
+
 games = {
     # Console games
-    'metroid'                : ('Metroid', 'Metroid.zip', 'Nintendo SNES'),
-    'mworld'                 : ('Super Mario World', 'Super Mario World.zip', 'Nintendo SNES'),
-    'sonic_megadrive'        : ('Sonic the Hedgehog', 'Sonic the Hedgehog (USA, Europe).zip', 'Sega Mega Drive'),
+    'metroid'                : Game('Metroid', 'Metroid.zip', 'Nintendo SNES'),
+    'mworld'                 : Game('Super Mario World', 'Super Mario World.zip', 'Nintendo SNES'),
+    'sonic_megadrive'        : Game('Sonic the Hedgehog', 'Sonic the Hedgehog (USA, Europe).zip', 'Sega Mega Drive'),
     # Genesis is an aliased name for Mega Drive
-    'sonic_genesis'          : ('Sonic the Hedgehog', 'Sonic the Hedgehog (USA, Europe).zip', 'Sega Genesis'),
-    'chakan'                 : ('Chakan', 'Chakan (USA, Europe).zip', 'Sega MegaDrive'),
-    'ff7'                    : ('Final Fantasy VII', 'Final Fantasy VII (USA) (Disc 1).iso', 'Sony PlayStation'),
-    'console_wrong_title'    : ('Console invalid game', 'mjhyewqr.zip', 'Sega MegaDrive'),
-    'console_wrong_platform' : ('Sonic the Hedgehog', 'Sonic the Hedgehog (USA, Europe).zip', 'mjhyewqr'),
+    'sonic_genesis'          : Game('Sonic the Hedgehog', 'Sonic the Hedgehog (USA, Europe).zip', 'Sega Genesis'),
+    'chakan'                 : Game('Chakan', 'Chakan (USA, Europe).zip', 'Sega MegaDrive'),
+    'ff7'                    : Game('Final Fantasy VII', 'Final Fantasy VII (USA) (Disc 1).iso', 'Sony PlayStation'),
+    'console_wrong_title'    : Game('Console invalid game', 'mjhyewqr.zip', 'Sega MegaDrive'),
+    'console_wrong_platform' : Game('Sonic the Hedgehog', 'Sonic the Hedgehog (USA, Europe).zip', 'mjhyewqr'),
     # Test Github AEL issue #142
-    'bforever'               : ('batman forever', 'batman forever.zip', 'Unknown'),
-    'bforever_snes'          : ('batman forever', 'batman forever.zip', 'Nintendo SNES'),
+    'bforever'               : Game('batman forever', 'batman forever.zip', 'Unknown'),
+    'bforever_snes'          : Game('batman forever', 'batman forever.zip', 'Nintendo SNES'),
 
     # MAME games
-    'atetris'             : ('Tetris (set 1)', 'atetris.zip', 'MAME'),
-    'mslug'               : ('Metal Slug - Super Vehicle-001', 'mslug.zip', 'MAME'),
-    'dino'                : ('Cadillacs and Dinosaurs (World 930201)', 'dino.zip', 'MAME'),
-    'MAME_wrong_title'    : ('MAME invalid game', 'mjhyewqr.zip', 'MAME'),
-    'MAME_wrong_platform' : ('Tetris (set 1)', 'atetris.zip', 'mjhyewqr'),
+    'atetris'             : Game('Tetris (set 1)', 'atetris.zip', 'MAME'),
+    'mslug'               : Game('Metal Slug - Super Vehicle-001', 'mslug.zip', 'MAME'),
+    'dino'                : Game('Cadillacs and Dinosaurs (World 930201)', 'dino.zip', 'MAME'),
+    'MAME_wrong_title'    : Game('MAME invalid game', 'mjhyewqr.zip', 'MAME'),
+    'MAME_wrong_platform' : Game('Tetris (set 1)', 'atetris.zip', 'mjhyewqr'),
 }
 
+# Returns the arguments of Scraper.get_candidates() for a test game:
+# (search_term, rom_FN, rom_checksums_FN, platform).
+# The ROM FileName is only created for the game being tested.
+def get_candidates_args(game):
+    rom_FN = utils.FileName(game.rombase)
+    return game.search_term, rom_FN, rom_FN, game.platform
+
 def abort_on_error(st_dic):
     if st_dic['abort']:
         print('st_dic abort dialog "{}"'.format(st_dic['dialog']))
@@ -0,0 +1,62 @@
+#!/usr/bin/python3 -B
+# -*- coding: utf-8 -*-
+
+# Run all the scraper test scripts in this directory.
+#
+# The test scripts are network bound (one blocking HTTPS request after another) so scripts
+# of different scrapers are run concurrently. Scripts of the same scraper are run one after
+# another because they share the same disk cache files in ./cache/.
+# The output of every script is printed when the script finishes.
+
+# --- Python standard library ---
+import concurrent.futures
+import os
+import subprocess
+import sys
+import time
+
+# --- configuration ------------------------------------------------------------------------------
+# Maximum number of scrapers tested at the same time.
+MAX_WORKERS = 8
+
+test_scripts = {
+    'AEL_Offline' : ['test_AEL_offline_metadata.py'],
+    'ArcadeDB' : ['test_ArcadeDB_metadata.py', 'test_ArcadeDB_asset.py'],
+    'GameFAQs' : ['test_GameFAQs_metadata.py', 'test_GameFAQs_asset.py'],
+    'MobyGames' : ['test_MobyGames_metadata.py', 'test_MobyGames_asset.py'],
+    'ScreenScraper' : ['test_ScreenScraper_metadata.py', 'test_ScreenScraper_asset.py'],
+    'TGDB' : ['test_TGDB_metadata.py', 'test_TGDB_asset.py'],
+}
+
+# Runs the test scripts of one scraper sequentially.
+# Returns a list of tuples (script_name, return_code, output_str, elapsed_time).
+def run_scraper_scripts(script_list):
+    results = []
+    for script_name in script_list:
+        start_time = time.time()
+        proc = subprocess.run([sys.executable, '-B', script_name],
+            cwd = os.path.dirname(os.path.abspath(__file__)),
+            stdout = subprocess.PIPE, stderr = subprocess.STDOUT)
+        output_str = proc.stdout.decode('utf-8', errors = 'replace')
+        results.append((script_name, proc.returncode, output_str, time.time() - start_time))
+    return results
+
+# --- main ---------------------------------------------------------------------------------------
+start_time = time.time()
+summary = []
+with concurrent.futures.ThreadPoolExecutor(max_workers = MAX_WORKERS) as executor:
+    futures = {
+        executor.submit(run_scraper_scripts, test_scripts[scraper_name]) : scraper_name
+        for scraper_name in test_scripts
+    }
+    for future in concurrent.futures.as_completed(futures):
+        for script_name, return_code, output_str, elapsed_time in future.result():
+            print('\n*** {} {}'.format(script_name, '*' * (95 - len(script_name))))
+            print(output_str)
+            summary.append((script_name, return_code, elapsed_time))
+
+print('\n*** Summary ***********************************************************************************')
+for script_name, return_code, elapsed_time in sorted(summary):
+    status_str = 'OK' if return_code == 0 else 'FAILED ({})'.format(return_code)
+    print('{:<35} {:<12} {:6.2f} s'.format(script_name, status_str, elapsed_time))
+print('Total time {:.2f} s'.format(time.time() - start_time))
@@ -17,6 +17,7 @@ import resources.misc as misc
 import resources.utils as utils
 import resources.kodi as kodi
 import resources.scrap as scrap
+import resources.fastjson as fastjson
 import common
 
 # --- Python standard library ---
@@ -32,9 +33,8 @@ output_fname = 'assets/ScreenScraper_gameInfo_clean.json'
 # --- main ---------------------------------------------------------------------------------------
 # --- Load JSON data ---
 print('Loading file "{}"'.format(input_fname))
-with io.open(input_fname, 'rt', encoding = 'utf-8') as file:
-    json_str = file.read()
-json_data = json.loads(json_str)
+with io.open(input_fname, 'rb') as file:
+    json_data = fastjson.loads(file.read())
 
 log.set_log_level(log.LOG_DEBUG)
 scraper = scrap.ScreenScraper(common.settings)
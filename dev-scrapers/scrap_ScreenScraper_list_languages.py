@@ -16,12 +16,12 @@ import resources.misc as misc
 import resources.utils as utils
 import resources.kodi as kodi
 import resources.scrap as scrap
+import resources.fastjson as fastjson
 import common
 
 # --- Python standard library ---
 import collections
 import io
-import json
 import pprint
 
 # --- configuration ------------------------------------------------------------------------------
@@ -37,9 +37,8 @@ use_cached_ScreenScraper_get_language_list = False
 if use_cached_ScreenScraper_get_language_list:
     filename = 'assets/ScreenScraper_get_language_list.json'
     print('Loading file "{}"'.format(filename))
-    with io.open(filename, 'rt', encoding = 'utf-8') as file:
-        json_str = file.read()
-    json_data = json.loads(json_str)
+    with io.open(filename, 'rb') as file:
+        json_data = fastjson.loads(file.read())
 else:
     log.set_log_level(log.LOG_DEBUG)
     # --- Create scraper object ---
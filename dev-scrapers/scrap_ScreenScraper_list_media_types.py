@@ -15,13 +15,18 @@ if __name__ == "__main__" and __package__ is None:
 import resources.const as const
 import resources.log as log
 import resources.misc as misc
-import resources.utils as utils
 import resources.kodi as kodi
 import resources.scrap as scrap
+import resources.fastjson as fastjson
 import common
 
 # --- Python standard library ---
+import io
 import pprint
+try:
+    import simdjson
+except ImportError:
+    simdjson = None
 
 # --- Settings -----------------------------------------------------------------------------------
 use_cached_ScreenScraper_get_gameInfo = False
@@ -30,9 +35,16 @@ use_cached_ScreenScraper_get_gameInfo = False
 if use_cached_ScreenScraper_get_gameInfo:
     filename = 'assets/ScreenScraper_get_gameInfo.json'
     print('Loading file "{}"'.format(filename))
-    with io.open(filename, 'rt', encoding = 'utf-8') as file:
-        json_str = file.read()
-    json_data = json.loads(json_str)
+    # pysimdjson On-Demand parsing only builds Python objects for the fields actually read,
+    # the rest of the document (roms, dates, classifications, ...) is skipped.
+    # Objects returned by the parser behave like read-only dictionaries and lists.
+    if simdjson:
+        parser = simdjson.Parser()
+        with io.open(filename, 'rb') as file:
+            json_data = parser.parse(file.read())
+    else:
+        with io.open(filename, 'rb') as file:
+            json_data = fastjson.loads(file.read())
     # pprint.pprint(json_data)
     jeu_dic = json_data['response']['jeu']
 else:
@@ -45,12 +57,11 @@ else:
         '414FA339', '9db5682a4d778ca2cb79580bdb67083f', '48c98f7e5a6e736d790ab740dfc3f51a61abe2b5', 123456)
     st = kodi.new_status_dic()
     # --- Get candidates ---
-    search_term, rombase, platform = common.games['metroid']
-    # search_term, rombase, platform = common.games['mworld']
-    # search_term, rombase, platform = common.games['sonic_megadrive']
-    # search_term, rombase, platform = common.games['sonic_genesis'] # Aliased platform
-    rom_FN = utils.FileName(rombase)
-    rom_checksums_FN = utils.FileName(rombase)
+    game = common.games['metroid']
+    # game = common.games['mworld']
+    # game = common.games['sonic_megadrive']
+    # game = common.games['sonic_genesis'] # Aliased platform
+    search_term, rom_FN, rom_checksums_FN, platform = common.get_candidates_args(game)
     candidate_list = scraper.get_candidates(search_term, rom_FN, rom_checksums_FN, platform, st)
     # --- Get jeu_dic and dump asset data ---
     # json_data = scraper.get_gameInfos_dic(candidate_list[0], st_dic = st)
@@ -64,15 +75,11 @@ print('\nListing jeu_dic first level dictionary keys')
 for key in sorted(jeu_dic): print(key)
 
 # --- Dump asset data ---
-medias_list = jeu_dic['medias']
+medias_list = jeu_dic.get('medias', ())
+table_formatter = misc.TableFormatter(['left', 'left', 'left'], ['Type', 'Region', 'Format'])
 table = [
-    ['left', 'left', 'left'],
-    ['Type', 'Region', 'Format'],
+    list(map(str, (media_dic['type'], media_dic.get('region'), media_dic['format'])))
+    for media_dic in medias_list
 ]
-for media_dic in medias_list:
-    region = media_dic['region'] if 'region' in media_dic else None
-    table.append([
-        str(media_dic['type']), str(region), str(media_dic['format'])
-    ])
 print('\nThere are {} assets'.format(len(medias_list)))
-print('\n'.join(misc.render_table(table)))
+print('\n'.join(table_formatter.render(table)))
@@ -20,6 +20,7 @@ import common
 
 # --- Python standard library ---
 import io
+import operator
 import pprint
 
 # --- configuration ------------------------------------------------------------------------------
@@ -40,7 +41,6 @@ scraper.set_debug_file_dump(True, os.path.join(os.path.dirname(__file__), 'asset
 json_data = scraper.debug_get_platforms(st)
 common.abort_on_error(st)
 platforms_dic = json_data['data']['platforms']
-pname_dic = {platforms_dic[platform]['name'] : platform for platform in platforms_dic}
 # pprint.pprint(platforms_dic)
 
 # --- Print list ---
@@ -51,19 +51,12 @@ table_str = [
     ['left', 'left', 'left'],
     ['ID', 'Name', 'Short name'],
 ]
-for pname in sorted(pname_dic, reverse = False):
-    platform = platforms_dic[pname_dic[pname]]
-    # print('{0} {1} {2}'.format(platform['id'], platform['name'], platform['alias']))
-    try:
-        table_str.append([
-            str(platform['id']),
-            str(platform['name']),
-            str(platform['alias'])
-        ])
-    except UnicodeEncodeError as ex:
-        print('Exception UnicodeEncodeError')
-        print('ID {}'.format(platform['id']))
-        sys.exit(0)
+# str() cannot raise UnicodeEncodeError in Python 3, the loop needs no exception handler.
+# Some platforms have no alias (None), str() converts it to 'None'.
+table_str.extend(
+    [str(platform['id']), str(platform['name']), str(platform['alias'])]
+    for platform in sorted(platforms_dic.values(), key = operator.itemgetter('name'))
+)
 table_str_list = misc.render_table(table_str)
 sl.extend(table_str_list)
 text_str = '\n'.join(sl)
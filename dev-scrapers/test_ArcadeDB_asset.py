@@ -12,7 +12,6 @@ if __name__ == "__main__" and __package__ is None:
     sys.path.append(path)
 import resources.const as const
 import resources.log as log
-import resources.utils as utils
 import resources.kodi as kodi
 import resources.scrap as scrap
 import common
@@ -31,24 +30,25 @@ scraper.set_verbose_mode(False)
 scraper.set_debug_file_dump(True, os.path.join(os.path.dirname(__file__), 'assets'))
 
 # --- Choose data for testing ---
-# search_term, rombase, platform = common.games['tetris']
-# search_term, rombase, platform = common.games['mslug']
-search_term, rombase, platform = common.games['dino']
-# search_term, rombase, platform = common.games['MAME_wrong_title']
-# search_term, rombase, platform = common.games['MAME_wrong_platform']
+# game = common.games['tetris']
+# game = common.games['mslug']
+game = common.games['dino']
+# game = common.games['MAME_wrong_title']
+# game = common.games['MAME_wrong_platform']
 
 # --- Get candidates, print them and set first candidate ---
-rom_FN = utils.FileName(rombase)
-rom_checksums_FN = utils.FileName(rombase)
+search_term, rom_FN, rom_checksums_FN, platform = common.get_candidates_args(game)
+# If the game is in the candidates disk cache do not search the scraper again.
 if scraper.check_candidates_cache(rom_FN, platform):
     print('>>> Game "{}" "{}" in disk cache.'.format(rom_FN.getBase(), platform))
+    scraper.set_candidate_from_cache(rom_FN, platform)
 else:
     print('>>> Game "{}" "{}" not in disk cache.'.format(rom_FN.getBase(), platform))
-candidate_list = scraper.get_candidates(search_term, rom_FN, rom_checksums_FN, platform, st)
-# pprint.pprint(candidate_list)
-common.handle_get_candidates(candidate_list, st)
-common.print_candidate_list(candidate_list)
-scraper.set_candidate(rom_FN, platform, candidate_list[0])
+    candidate_list = scraper.get_candidates(search_term, rom_FN, rom_checksums_FN, platform, st)
+    # pprint.pprint(candidate_list)
+    common.handle_get_candidates(candidate_list, st)
+    common.print_candidate_list(candidate_list)
+    scraper.set_candidate(rom_FN, platform, candidate_list[0])
 
 # --- Print list of assets found -----------------------------------------------------------------
 print('\n*** Fetching game assets **************************************************************')
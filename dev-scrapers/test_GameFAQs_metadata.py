@@ -34,28 +34,29 @@ scraper_obj.set_verbose_mode(False)
 scraper_obj.set_debug_file_dump(True, os.path.join(os.path.dirname(__file__), 'assets'))
 
 # --- Choose data for testing ---
-# search_term, rombase, platform = common.games['metroid']
-# search_term, rombase, platform = common.games['mworld']
-# search_term, rombase, platform = common.games['sonic_megadrive']
-# search_term, rombase, platform = common.games['sonic_genesis'] # Aliased platform
-# search_term, rombase, platform = common.games['chakan']
-# search_term, rombase, platform = common.games['console_wrong_title']
-# search_term, rombase, platform = common.games['console_wrong_platform']
-search_term, rombase, platform = common.games['bforever']
-# search_term, rombase, platform = common.games['bforever_snes']
+# game = common.games['metroid']
+# game = common.games['mworld']
+# game = common.games['sonic_megadrive']
+# game = common.games['sonic_genesis'] # Aliased platform
+# game = common.games['chakan']
+# game = common.games['console_wrong_title']
+# game = common.games['console_wrong_platform']
+game = common.games['bforever']
+# game = common.games['bforever_snes']
 
 # --- Get candidates, print them and set first candidate ---
-rom_FN = FileName(rombase)
-rom_checksums_FN = FileName(rombase)
+search_term, rom_FN, rom_checksums_FN, platform = common.get_candidates_args(game)
+# If the game is in the candidates disk cache do not search the scraper again.
 if scraper_obj.check_candidates_cache(rom_FN, platform):
     print('>>> Game "{}" "{}" in disk cache.'.format(rom_FN.getBase(), platform))
+    scraper_obj.set_candidate_from_cache(rom_FN, platform)
 else:
     print('>>> Game "{}" "{}" not in disk cache.'.format(rom_FN.getBase(), platform))
-candidate_list = scraper_obj.get_candidates(search_term, rom_FN, rom_checksums_FN, platform, st_dic)
-# pprint.pprint(candidate_list)
-common.handle_get_candidates(candidate_list, st_dic)
-common.print_candidate_list(candidate_list)
-scraper_obj.set_candidate(rom_FN, platform, candidate_list[0])
+    candidate_list = scraper_obj.get_candidates(search_term, rom_FN, rom_checksums_FN, platform, st_dic)
+    # pprint.pprint(candidate_list)
+    common.handle_get_candidates(candidate_list, st_dic)
+    common.print_candidate_list(candidate_list)
+    scraper_obj.set_candidate(rom_FN, platform, candidate_list[0])
 
 # --- Print metadata of first candidate ----------------------------------------------------------
 print('\n*** Fetching game metadata **************************************************************')
@@ -16,15 +16,36 @@
 # --- Modules/packages in this plugin ---
 import resources.const as const
 import resources.log as log
-import resources.misc as misc
+import resources.utils as utils
 
 # --- Python standard library ---
+import io
 import os
-import xml
+import re
+import sys
+# See comments in utils.py about cElementTree.
+try:
+    import xml.etree.cElementTree as ET
+except ImportError:
+    import xml.etree.ElementTree as ET
 
 # -------------------------------------------------------------------------------------------------
 # Data structures
 # -------------------------------------------------------------------------------------------------
+# Fields that take few distinct values (years, publishers, genres, parent names, ...) in XML
+# files with thousands of games. These strings are interned so all the games share one copy.
+# In Python 2 intern() does not accept Unicode strings so interning is not done.
+INTERNED_TAGS = frozenset([
+    'cloneof', 'year', 'manufacturer', 'genre', 'rating', 'player',
+    'publisher', 'developer', 'nplayers',
+    'Platform', 'ReleaseYear', 'Publisher', 'Developer', 'Genres', 'ESRB', 'MaxPlayers',
+    'Cooperative', 'DOS', 'Type', 'Region',
+])
+if const.ADDON_RUNNING_PYTHON_3:
+    intern_str = sys.intern
+else:
+    intern_str = lambda s: s
+
 # DTD "http://www.logiqx.com/Dats/datafile.dtd"
 def new_rom_logiqx():
     return {
@@ -127,64 +148,84 @@ def new_LB_gameImage():
         'Region'     : '',
     }
 
+# Valid child tags of the LaunchBox Metadata.xml root children. Checked for every child tag
+# read, so keep them in sets and not in the dictionaries being filled.
+LB_GAME_TAGS = frozenset(new_LB_game())
+LB_PLATFORM_TAGS = frozenset(new_LB_platform())
+LB_GAMEIMAGE_TAGS = frozenset(new_LB_gameImage())
+
+# Fills record with the children of a LaunchBox Metadata.xml root child.
+# Returns None if an unknown child tag is found.
+def _LB_parse_record(xml_element, record, valid_tags):
+    for xml_child in xml_element:
+        xml_tag, xml_text = xml_child.tag, xml_child.text or ''
+        if xml_tag not in valid_tags:
+            log.info('Unknown <{}> child tag <{}>'.format(xml_element.tag, xml_tag))
+            return None
+        record[xml_tag] = intern_str(xml_text) if xml_tag in INTERNED_TAGS else xml_text
+    return record
+
 def load_LB_metadata_XML(filename_FN, games_dic, platforms_dic, gameimages_dic):
     if not filename_FN.exists():
-        log.error("Cannot load file '{}'".format(xml_file))
+        log.error("Cannot load file '{}'".format(filename_FN.getPath()))
         return
 
-    # --- Parse using cElementTree ---
+    # Root child tag -> (record factory, valid child tags, key tag, target dictionary).
+    # Root children mapped to None are ignored.
+    LB_handlers = {
+        'Game'                  : (new_LB_game, LB_GAME_TAGS, 'Name', games_dic),
+        'Platform'              : (new_LB_platform, LB_PLATFORM_TAGS, 'Name', platforms_dic),
+        'GameImage'             : (new_LB_gameImage, LB_GAMEIMAGE_TAGS, 'FileName', gameimages_dic),
+        'PlatformAlternateName' : None,
+        'Emulator'              : None,
+        'EmulatorPlatform'      : None,
+        'GameAlternateName'     : None,
+    }
+
+    # --- Parse using ElementTree ---
+    # LaunchBox Metadata.xml is hundreds of MB. Do not build the whole tree in memory, root
+    # children are processed and discarded one by one.
     log.debug('audit_load_LB_metadata_XML() Loading "{}"'.format(filename_FN.getPath()))
-    xml_tree = utils_load_XML_to_ET(filename_FN.getPath())
-    xml_root = xml_tree.getroot()
-    for xml_element in xml_root:
-        if xml_element.tag == 'Game':
-            game = audit_new_LB_game()
-            for xml_child in xml_element:
-                xml_tag  = xml_child.tag
-                xml_text = xml_child.text if xml_child.text is not None else ''
-                if xml_tag not in game:
-                    log.info('Unknown <Game> child tag <{}>'.format(xml_tag))
-                    return
-                game[xml_tag] = text_unescape_XML(xml_text)
-            games_dic[game['Name']] = game
-        elif xml_element.tag == 'Platform':
-            platform = audit_new_LB_platform()
-            for xml_child in xml_element:
-                xml_tag  = xml_child.tag
-                xml_text = xml_child.text if xml_child.text is not None else ''
-                if xml_tag not in platform:
-                    log.info('Unknown <Platform> child tag <{}>'.format(xml_tag))
-                    return
-                platform[xml_tag] = text_unescape_XML(xml_text)
-            platforms_dic[platform['Name']] = platform
-        elif xml_element.tag == 'PlatformAlternateName':
-            pass
-        elif xml_element.tag == 'Emulator':
-            pass
-        elif xml_element.tag == 'EmulatorPlatform':
-            pass
-        elif xml_element.tag == 'GameAlternateName':
-            pass
-        elif xml_element.tag == 'GameImage':
-            game_image = audit_new_LB_gameImage()
-            for xml_child in xml_element:
-                xml_tag  = xml_child.tag
-                xml_text = xml_child.text if xml_child.text is not None else ''
-                if xml_tag not in game_image:
-                    log.info('Unknown <GameImage> child tag <{}>'.format(xml_tag))
-                    return
-                game_image[xml_tag] = text_unescape_XML(xml_text)
-            gameimages_dic[game_image['FileName']] = game_image
-        else:
-            log.info('Unknwon main tag <{}>'.format(xml_element.tag))
-            return
-    log.debug('audit_load_LB_metadata_XML() Loaded {} games ({} bytes)'.format(len(games_dic), sys.getsizeof(games_dic)))
+    try:
+        for xml_element in utils.iterparse_XML_root_children(filename_FN.getPath()):
+            handler = LB_handlers.get(xml_element.tag)
+            if handler is None:
+                if xml_element.tag in LB_handlers: continue
+                log.info('Unknwon main tag <{}>'.format(xml_element.tag))
+                return
+            new_record, valid_tags, key_tag, target_dic = handler
+            record = _LB_parse_record(xml_element, new_record(), valid_tags)
+            if record is None: return
+            target_dic[record[key_tag]] = record
+    except (IOError, ET.ParseError) as ex:
+        log.error('audit_load_LB_metadata_XML() Exception parsing "{}"'.format(filename_FN.getPath()))
+        log.error('audit_load_LB_metadata_XML() {}'.format(const.text_type(ex)))
+        return
+    log.debug('audit_load_LB_metadata_XML() Loaded {} games'.format(len(games_dic)))
     log.debug('audit_load_LB_metadata_XML() Loaded {} platforms'.format(len(platforms_dic)))
     log.debug('audit_load_LB_metadata_XML() Loaded {} game images'.format(len(gameimages_dic)))
 
 # -------------------------------------------------------------------------------------------------
 # Functions
 # -------------------------------------------------------------------------------------------------
+# Makes the function that converts a <game> element into a game dictionary for the XML files
+# with a fixed schema (AEL Offline Scraper, GameDB and HyperList). new_record() returns a game
+# with default values and the game name is read from the name_attrib attribute of <game>.
+# Populators are made once per schema when the module is loaded.
+def _make_game_populator(new_record, name_attrib, name_key):
+    def populate(game_element):
+        game = new_record()
+        game[name_key] = game_element.attrib[name_attrib]
+        for game_child in game_element:
+            xml_tag, xml_text = game_child.tag, game_child.text or ''
+            game[xml_tag] = intern_str(xml_text) if xml_tag in INTERNED_TAGS else xml_text
+        return game
+    return populate
+
+_populate_AEL_Offline_game = _make_game_populator(new_rom_AEL_Offline, 'ROM', 'ROM')
+_populate_GameDB_game = _make_game_populator(new_rom_GameDB, 'name', 'name')
+_populate_HyperList_game = _make_game_populator(new_rom_HyperList, 'name', 'name')
+
 # Loads offline scraper information XML file.
 def load_OfflineScraper_XML(xml_file):
     __debug_xml_parser = False
@@ -195,36 +236,24 @@ def load_OfflineScraper_XML(xml_file):
         log.error("Cannot load file '{}'".format(xml_file))
         return games
 
-    # --- Parse using cElementTree ---
+    # --- Parse using ElementTree ---
     log.debug('audit_load_OfflineScraper_XML() Loading "{}"'.format(xml_file))
     try:
-        xml_tree = xml.etree.ElementTree.parse(xml_file)
-    except xml.etree.ElementTree.ParseError as ex:
-        log.error('(ParseError) Exception parsing XML categories.xml')
-        log.error('(ParseError) {}'.format(text_type(ex)))
-        return games
-    xml_root = xml_tree.getroot()
-    for game_element in xml_root:
-        if __debug_xml_parser:
-            log.debug('=== Root child tag "{}" ==='.format(game_element.tag))
-
-        if game_element.tag == 'game':
-            # Default values
-            game = new_rom_AEL_Offline()
-
-            # ROM name is an attribute of <game>
-            game['ROM'] = game_element.attrib['ROM']
-            if __debug_xml_parser: log.debug('Game name = "{}"'.format(game['ROM']))
-
-            # Parse child tags of category
-            for game_child in game_element:
-                # By default read strings
-                xml_text = game_child.text if game_child.text is not None else ''
-                xml_text = misc.unescape_XML(xml_text)
-                xml_tag  = game_child.tag
-                if __debug_xml_parser: log.debug('Tag "{}" --> "{}"'.format(xml_tag, xml_text))
-                game[xml_tag] = xml_text
-            games[game['ROM']] = game
+        for game_element in utils.iterparse_XML_root_children(xml_file):
+            if __debug_xml_parser:
+                log.debug('=== Root child tag "{}" ==='.format(game_element.tag))
+
+            if game_element.tag == 'game':
+                game = _populate_AEL_Offline_game(game_element)
+                if __debug_xml_parser: log.debug('Game name = "{}"'.format(game['ROM']))
+                games[game['ROM']] = game
+    except ET.ParseError as ex:
+        log.error('(ParseError) Exception parsing XML "{}"'.format(xml_file))
+        log.error('(ParseError) {}'.format(const.text_type(ex)))
+        return {}
+    except IOError as ex:
+        log.error('(IOError) {}'.format(const.text_type(ex)))
+        return {}
     return games
 
 # Loads a No-Intro Parent-Clone XML DAT file. Creates a data structure like
@@ -240,27 +269,28 @@ def load_NoIntro_XML_file(xml_FN):
         log.error('Does not exists "{}"'.format(xml_FN.getPath()))
         return nointro_roms
 
-    # --- Parse using cElementTree ---
+    # --- Parse using ElementTree ---
     log.debug('Loading XML "{}"'.format(xml_FN.getOriginalPath()))
     try:
-        xml_tree = xml.etree.ElementTree.parse(xml_FN.getPath())
-    except xml.etree.ElementTree.ParseError as ex:
-        log.error('(ParseError) Exception parsing XML categories.xml')
-        log.error('(ParseError) {}'.format(text_type(ex)))
-        return nointro_roms
+        for root_element in utils.iterparse_XML_root_children(xml_FN.getPath()):
+            if root_element.tag == 'game':
+                # Full No-Intro/Redump sets have 100k+ games. Build the record in one step
+                # with the same keys as new_rom_logiqx() instead of filling a default dict.
+                attrib = root_element.attrib
+                rom_name = attrib['name']
+                nointro_roms[rom_name] = {
+                    'name'         : rom_name,
+                    'cloneof'      : intern_str(attrib.get('cloneof', '')),
+                    'year'         : '',
+                    'manufacturer' : '',
+                }
+    except ET.ParseError as ex:
+        log.error('(ParseError) Exception parsing XML "{}"'.format(xml_FN.getPath()))
+        log.error('(ParseError) {}'.format(const.text_type(ex)))
+        return {}
     except IOError as ex:
-        log.error('(IOError) {}'.format(text_type(ex)))
-        return nointro_roms
-    xml_root = xml_tree.getroot()
-    for root_element in xml_root:
-        if root_element.tag == 'game':
-            nointro_rom = audit_new_rom_logiqx()
-            rom_name = root_element.attrib['name']
-            nointro_rom['name'] = rom_name
-            if 'cloneof' in root_element.attrib:
-                nointro_rom['cloneof'] = root_element.attrib['cloneof']
-            nointro_roms[rom_name] = nointro_rom
-
+        log.error('(IOError) {}'.format(const.text_type(ex)))
+        return {}
     return nointro_roms
 
 def load_GameDB_XML(xml_FN):
@@ -273,37 +303,46 @@ def load_GameDB_XML(xml_FN):
         return games
     log.debug('Loading XML "{}"'.format(xml_FN.getPath()))
     try:
-        xml_tree = xml.etree.ElementTree.parse(xml_FN.getPath())
-    except xml.etree.ElementTree.ParseError as ex:
-        log.error('(ParseError) Exception parsing XML categories.xml')
-        log.error('(ParseError) {}'.format(text_type(ex)))
-        return games
-    xml_root = xml_tree.getroot()
-    for game_element in xml_root:
-        if __debug_xml_parser:
-            log.debug('=== Root child tag "{}" ==='.format(game_element.tag))
-
-        if game_element.tag == 'game':
-            # Default values
-            game = audit_new_rom_GameDB()
-
-            # ROM name is an attribute of <game>
-            game['name'] = game_element.attrib['name']
-            if __debug_xml_parser: log.debug('Game name = "{}"'.format(game['name']))
-
-            # Parse child tags of category
-            for game_child in game_element:
-                # By default read strings
-                xml_text = game_child.text if game_child.text is not None else ''
-                xml_text = text_unescape_XML(xml_text)
-                xml_tag  = game_child.tag
-                if __debug_xml_parser: log.debug('Tag "{}" --> "{}"'.format(xml_tag, xml_text))
-                game[xml_tag] = xml_text
-            key = game['name']
-            games[key] = game
-
+        for game_element in utils.iterparse_XML_root_children(xml_FN.getPath()):
+            if __debug_xml_parser:
+                log.debug('=== Root child tag "{}" ==='.format(game_element.tag))
+
+            if game_element.tag == 'game':
+                game = _populate_GameDB_game(game_element)
+                if __debug_xml_parser: log.debug('Game name = "{}"'.format(game['name']))
+                key = game['name']
+                games[key] = game
+    except ET.ParseError as ex:
+        log.error('(ParseError) Exception parsing XML "{}"'.format(xml_FN.getPath()))
+        log.error('(ParseError) {}'.format(const.text_type(ex)))
+        return {}
+    except IOError as ex:
+        log.error('(IOError) {}'.format(const.text_type(ex)))
+        return {}
     return games
 
+# Tempest INI field name -> game dictionary field. Fields mapped to None are ignored.
+TEMPEST_INI_FIELDS = {
+    'Publisher'   : 'manufacturer',
+    'Developer'   : 'dev',
+    'Released'    : 'year',
+    'Systems'     : None,
+    'Genre'       : 'genre',
+    'Perspective' : None,
+    'Score'       : 'score',
+    'Controls'    : None,
+    'Players'     : 'player',
+    'Esrb'        : 'rating',
+    'Url'         : None,
+    'Description' : 'story',
+    'Goodname'    : None,
+    'NoIntro'     : None,
+    'Tosec'       : None,
+}
+
+# Game section header [game_name]. Lines are stripped so the header starts at column 0.
+_TEMPEST_INI_SECTION_RE = re.compile(r'\[([^\]]+)\]')
+
 def load_Tempest_INI(file_FN):
     games = {}
     # Read_status FSM values
@@ -317,18 +356,20 @@ def load_Tempest_INI(file_FN):
         log.error('Does not exists "{}"'.format(file_FN.getPath()))
         return games
     log.debug('Loading XML "{}"'.format(file_FN.getPath()))
+    # Read the whole file and decode it once. Invalid UTF-8 characters are replaced.
     try:
-        f = open(file_FN.getPath(), 'rt')
+        with io.open(file_FN.getPath(), 'rb') as f:
+            file_str = f.read().decode('utf-8', 'replace')
     except IOError:
-        log.info('audit_load_Tempest_INI() IOError opening "{}"'.format(filename))
+        log.info('audit_load_Tempest_INI() IOError opening "{}"'.format(file_FN.getPath()))
         return {}
-    for file_line in f:
-        stripped_line = file_line.strip().decode(errors = 'replace')
+    for file_line in file_str.splitlines():
+        stripped_line = file_line.strip()
         if __debug_INI_parser: print('Line "' + stripped_line + '"')
         if read_status == 0:
-            m = re.search(r'\[([^\]]+)\]', stripped_line)
+            m = _TEMPEST_INI_SECTION_RE.match(stripped_line)
             if m:
-                game = audit_new_rom_GameDB()
+                game = new_rom_GameDB()
                 game_key     = m.group(1)
                 game['name'] = m.group(1)
                 if __debug_INI_parser: print('Found game [{}]'.format(game['name']))
@@ -340,29 +381,14 @@ def load_Tempest_INI(file_FN):
                 games[game_key] = game
                 if __debug_INI_parser: print('Added game key "{}"'.format(game_key))
             else:
-                if __debug_INI_parser: print('Line list -> ' + text_type(line_list))
+                if __debug_INI_parser: print('Line list -> ' + const.text_type(line_list))
                 field_name = line_list[0]
                 field_value = line_list[1]
-                if   field_name == 'Publisher':   game['manufacturer'] = field_value
-                elif field_name == 'Developer':   game['dev'] = field_value
-                elif field_name == 'Released':    game['year'] = field_value
-                elif field_name == 'Systems':     pass
-                elif field_name == 'Genre':       game['genre'] = field_value
-                elif field_name == 'Perspective': pass
-                elif field_name == 'Score':       game['score'] = field_value
-                elif field_name == 'Controls':    pass
-                elif field_name == 'Players':     game['player'] = field_value
-                elif field_name == 'Esrb':        game['rating'] = field_value
-                elif field_name == 'Url':         pass
-                elif field_name == 'Description': game['story'] = field_value
-                elif field_name == 'Goodname':    pass
-                elif field_name == 'NoIntro':     pass
-                elif field_name == 'Tosec':       pass
-                else:
-                    raise NameError
+                if field_name not in TEMPEST_INI_FIELDS: raise NameError
+                game_field = TEMPEST_INI_FIELDS[field_name]
+                if game_field is not None: game[game_field] = field_value
         else:
-            raise CriticalError('Unknown read_status FSM value')
-    f.close()
+            raise ValueError('Unknown read_status FSM value')
     log.info('audit_load_Tempest_INI() Number of games {}'.format(len(games)))
 
     return games
@@ -377,68 +403,49 @@ def load_HyperList_XML(xml_FN):
         return games
     log.debug('Loading XML "{}"'.format(xml_FN.getPath()))
     try:
-        xml_tree = ET.parse(xml_FN.getPath())
+        for game_element in utils.iterparse_XML_root_children(xml_FN.getPath()):
+            if __debug_xml_parser:
+                log.debug('=== Root child tag "{}" ==='.format(game_element.tag))
+
+            if game_element.tag == 'game':
+                game = _populate_HyperList_game(game_element)
+                if __debug_xml_parser: log.debug('Game name = "{}"'.format(game['name']))
+                key = game['name']
+                games[key] = game
     except ET.ParseError as ex:
-        log.error('(ParseError) Exception parsing XML categories.xml')
-        log.error('(ParseError) {}'.format(text_type(ex)))
-        return games
+        log.error('(ParseError) Exception parsing XML "{}"'.format(xml_FN.getPath()))
+        log.error('(ParseError) {}'.format(const.text_type(ex)))
+        return {}
     except IOError as ex:
-        log.error('(IOError) {}'.format(text_type(ex)))
-        return games
-    xml_root = xml_tree.getroot()
-    for game_element in xml_root:
-        if __debug_xml_parser:
-            log.debug('=== Root child tag "{}" ==='.format(game_element.tag))
-
-        if game_element.tag == 'game':
-            # Default values
-            game = audit_new_rom_HyperList()
-
-            # ROM name is an attribute of <game>
-            game['name'] = game_element.attrib['name']
-            if __debug_xml_parser: log.debug('Game name = "{}"'.format(game['name']))
-
-            # Parse child tags of category
-            for game_child in game_element:
-                # By default read strings
-                xml_text = game_child.text if game_child.text is not None else ''
-                xml_text = text_unescape_XML(xml_text)
-                xml_tag  = game_child.tag
-                if __debug_xml_parser: log.debug('Tag "{}" --> "{}"'.format(xml_tag, xml_text))
-                game[xml_tag] = xml_text
-            key = game['name']
-            games[key] = game
-
+        log.error('(IOError) {}'.format(const.text_type(ex)))
+        return {}
     return games
 
-def make_NoIntro_PClone_dic(nointro_dic):
-    log.info('Making PClone dictionary ...')
+# Makes the Parent/Clone dictionary and the Clone to Parent dictionary of a No-Intro DAT
+# in a single traversal of nointro_dic.
+# main_pclone_dic          = { 'parent_name' : ['clone_name_1', ...], ... }
+# main_clone_to_parent_dic = { 'clone_name' : 'parent_name', ... }
+def make_NoIntro_indexes(nointro_dic):
+    log.info('Making PClone and Parents dictionaries ...')
     main_pclone_dic = {}
+    main_clone_to_parent_dic = {}
     for machine_name in nointro_dic:
-        machine = nointro_dic[machine_name]
-        if machine['cloneof']:
-            parent_name = machine['cloneof']
-            # >> If parent already in main_pclone_dic then add clone to parent list.
-            # >> If parent not there, then add parent first and then add clone.
-            if parent_name not in main_pclone_dic: main_pclone_dic[parent_name] = []
-            main_pclone_dic[parent_name].append(machine_name)
+        parent_name = nointro_dic[machine_name]['cloneof']
+        if parent_name:
+            main_clone_to_parent_dic[machine_name] = parent_name
+            # >> Add clone to parent list. Parent is added first if not there.
+            main_pclone_dic.setdefault(parent_name, []).append(machine_name)
         else:
             # >> Machine is a parent. Add to main_pclone_dic if not already there.
-            if machine_name not in main_pclone_dic: main_pclone_dic[machine_name] = []
+            main_pclone_dic.setdefault(machine_name, [])
 
-    return main_pclone_dic
+    return main_pclone_dic, main_clone_to_parent_dic
 
-def make_NoIntro_Parents_dic(nointro_dic):
-    log.info('Making Parents dictionary ...')
-    main_pclone_dic = {}
-    main_clone_to_parent_dic = {}
-    for machine_name in nointro_dic:
-        machine = nointro_dic[machine_name]
-        if machine['cloneof']:
-            parent_name = machine['cloneof']
-            main_clone_to_parent_dic[machine_name] = parent_name
+def make_NoIntro_PClone_dic(nointro_dic):
+    return make_NoIntro_indexes(nointro_dic)[0]
 
-    return main_clone_to_parent_dic
+def make_NoIntro_Parents_dic(nointro_dic):
+    return make_NoIntro_indexes(nointro_dic)[1]
 
 # -------------------------------------------------------------------------------------------------
 # No-Intro/Redump audit
@@ -472,7 +479,7 @@ def generate_DAT_PClone_index(roms, roms_nointro, unknown_ROMs_are_parents):
     names_to_ids_dic = {}
     for rom_id in roms:
         rom = roms[rom_id]
-        ROMFileName = FileName(rom['filename'])
+        ROMFileName = utils.FileName(rom['filename'])
         rom_name = ROMFileName.getBaseNoExt()
         # log.debug('{} --> {}'.format(rom_name, rom_id))
         # log.debug('{}'.format(rom))
@@ -481,7 +488,7 @@ def generate_DAT_PClone_index(roms, roms_nointro, unknown_ROMs_are_parents):
     # --- Build PClone dictionary using ROM base_noext names ---
     for rom_id in roms:
         rom = roms[rom_id]
-        ROMFileName = FileName(rom['filename'])
+        ROMFileName = utils.FileName(rom['filename'])
         rom_nointro_name = ROMFileName.getBaseNoExt()
         # log.debug('rom_id {}'.format(rom_id))
         # log.debug('  nointro_status   "{}"'.format(rom['nointro_status']))
@@ -489,7 +496,7 @@ def generate_DAT_PClone_index(roms, roms_nointro, unknown_ROMs_are_parents):
         # log.debug('  ROM_base_noext   "{}"'.format(ROMFileName.getBaseNoExt()))
         # log.debug('  rom_nointro_name "{}"'.format(rom_nointro_name))
 
-        if rom['nointro_status'] == AUDIT_STATUS_UNKNOWN:
+        if rom['nointro_status'] == const.AUDIT_STATUS_UNKNOWN:
             if unknown_ROMs_are_parents:
                 # Unknown ROMs are parents
                 if rom_id not in roms_pclone_index_by_id:
@@ -497,12 +504,12 @@ def generate_DAT_PClone_index(roms, roms_nointro, unknown_ROMs_are_parents):
             else:
                 # Unknown ROMs are clones
                 # Also, if the parent ROMs of all clones does not exist yet then create it
-                if UNKNOWN_ROMS_PARENT_ID not in roms_pclone_index_by_id:
-                    roms_pclone_index_by_id[UNKNOWN_ROMS_PARENT_ID] = []
-                    roms_pclone_index_by_id[UNKNOWN_ROMS_PARENT_ID].append(rom_id)
+                if const.UNKNOWN_ROMS_PARENT_ID not in roms_pclone_index_by_id:
+                    roms_pclone_index_by_id[const.UNKNOWN_ROMS_PARENT_ID] = []
+                    roms_pclone_index_by_id[const.UNKNOWN_ROMS_PARENT_ID].append(rom_id)
                 else:
-                    roms_pclone_index_by_id[UNKNOWN_ROMS_PARENT_ID].append(rom_id)
-        elif rom['nointro_status'] == AUDIT_STATUS_EXTRA:
+                    roms_pclone_index_by_id[const.UNKNOWN_ROMS_PARENT_ID].append(rom_id)
+        elif rom['nointro_status'] == const.AUDIT_STATUS_EXTRA:
             # Extra ROMs are parents.
             if rom_id not in roms_pclone_index_by_id:
                 roms_pclone_index_by_id[rom_id] = []
@@ -531,19 +538,21 @@ def generate_DAT_PClone_index(roms, roms_nointro, unknown_ROMs_are_parents):
 # metadata for it.
 #
 def generate_parent_ROMs_dic(roms, roms_pclone_index):
+    # db imports this module, import it here to avoid a circular import.
+    import resources.db as db
     p_roms = {}
 
     # --- Build parent ROM dictionary ---
     for rom_id in roms_pclone_index:
         # >> roms_pclone_index make contain the fake ROM id. Skip it if so because the fake
         # >> ROM is not in roms dictionary (KeyError exception)
-        if rom_id == UNKNOWN_ROMS_PARENT_ID:
-            rom = fs_new_rom()
-            rom['id']                      = UNKNOWN_ROMS_PARENT_ID
+        if rom_id == const.UNKNOWN_ROMS_PARENT_ID:
+            rom = db.new_rom()
+            rom['id']                      = const.UNKNOWN_ROMS_PARENT_ID
             rom['m_name']                  = '[Unknown ROMs]'
             rom['m_plot']                  = 'Special virtual ROM parent of all Unknown ROMs'
-            rom['nointro_status']          = NOINTRO_STATUS_NONE
-            p_roms[UNKNOWN_ROMS_PARENT_ID] = rom
+            rom['nointro_status']          = const.AUDIT_STATUS_NONE
+            p_roms[const.UNKNOWN_ROMS_PARENT_ID] = rom
         else:
             # >> Make a copy of the dictionary or the original dictionary in ROMs will be modified!
             # >> Clean parent ROM name tags from ROM Name
@@ -558,7 +567,7 @@ def generate_filename_PClone_index(roms, roms_nointro, unknown_ROMs_are_parents)
     rom_ID_bname_dic = {}
     for romID in roms:
         rom = roms[romID]
-        base_name = audit_get_ROM_base_name(rom['filename'])
+        base_name = get_ROM_base_name(rom['filename'])
         rom_ID_bname_dic[romID] = base_name
 
     # --- Create a parent/clone list based on the baseName of the ROM ---
@@ -600,7 +609,7 @@ def get_ROM_base_name(romFileName):
     # >> re.search() returns a MatchObject
     regSearch = re.search("[^\(\)]*", romFileName)
     if regSearch is None:
-        raise NameError('audit_get_ROM_base_name() regSearch is None')
+        raise NameError('get_ROM_base_name() regSearch is None')
     regExp_result = regSearch.group()
 
     return regExp_result.strip()
@@ -655,6 +664,7 @@ Retro_core_dic = {
 
 # See https://github.com/libretro/libretro-database/blob/master/dat/BIOS.dat
 # See https://github.com/libretro/libretro-database/blob/master/dat/BIOS%20-%20Non-Merged.dat
+# size is the file size in bytes, -1 if unknown.
 Libretro_BIOS_list = [
     # --- Atari 5200 ---
     # https://github.com/libretro/libretro-super/blob/master/dist/info/atari800_libretro.info
@@ -943,3 +953,13 @@ Libretro_BIOS_list = [
     # {'filename' : 'sanyotry.bin', 'size' : 1048576, 'md5': '35fa1a1ebaaeea286dc5cd15487c13ea',
     #  'mandatory' : True, 'cores' : []},
 ]
+
+# Indices of Libretro_BIOS_list built once when the module is loaded. Use them instead of
+# traversing the list to find a BIOS by filename or by MD5.
+# Some BIOSes are in the list several times with different filenames, so BIOS_BY_MD5
+# values are lists of BIOS dictionaries.
+BIOS_BY_FILENAME = {BIOS_dic['filename'] : BIOS_dic for BIOS_dic in Libretro_BIOS_list}
+BIOS_BY_MD5 = {}
+for BIOS_dic in Libretro_BIOS_list:
+    BIOS_BY_MD5.setdefault(BIOS_dic['md5'], []).append(BIOS_dic)
+del BIOS_dic
@@ -67,12 +67,15 @@ OPTION_LOWMEM_WRITE_JSON = False
 ADDON_LONG_NAME = 'Advanced Emulator Launcher'
 ADDON_SHORT_NAME = 'AEL'
 
-# These parameters are used in utils_write_JSON_file() when pprint is True or
+# These parameters are used in utils.write_JSON_file() when pprint is True or
 # OPTION_COMPACT_JSON is False. Otherwise non-human readable, compact JSON is written.
 # pprint = True function parameter overrides option OPTION_COMPACT_JSON.
 # More compact JSON files (less blanks) load faster because file size is smaller.
+# Compact JSON is written with JSON_SEP_COMPACT, the same separators the fast JSON libraries
+# use in fastjson.dumps_sorted_bytes().
 JSON_INDENT = 1
 JSON_SEP = (', ', ': ')
+JSON_SEP_COMPACT = (',', ':')
 
 # ------------------------------------------------------------------------------------------------
 # CUSTOM/DEBUG/TEST settings
@@ -151,6 +154,12 @@ IMAGE_MAGIC_DIC = {
 PLOT_STR_MAXSIZE = 40
 RETROPLAYER_LAUNCHER_APP_NAME = 'retroplayer_launcher_app'
 LNK_LAUNCHER_APP_NAME = 'lnk_launcher_app'
+# Special launcher applications that are not files in the filesystem. Maps the application
+# name stored in the launcher to the name displayed to the user.
+SPECIAL_LAUNCHER_APP_NAMES = {
+    RETROPLAYER_LAUNCHER_APP_NAME : 'Kodi Retroplayer',
+    LNK_LAUNCHER_APP_NAME : 'LNK Launcher',
+}
 
 
 # Special Category/Launcher IDs.
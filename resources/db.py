@@ -31,6 +31,7 @@ import os
 import string
 import sys
 import time
+import xml.etree.ElementTree
 
 # -------------------------------------------------------------------------------------------------
 # Data model used in the plugin
@@ -1055,10 +1056,25 @@ def load_launchers_XML(cfg):
     categories = cfg.categories
     launchers = cfg.launchers
 
-    xml_tree = utils.load_XML_to_ET(db_file.getPath())
-    if not xml_tree: return None
-    xml_root = xml_tree.getroot()
-    for category_element in xml_root:
+    try:
+        _load_launchers_XML_elements(cfg, db_file.getPath(), __debug_parser)
+    except IOError as ex:
+        log.error('load_launchers_XML() (IOError) {}'.format(const.text_type(ex)))
+        categories.clear()
+        launchers.clear()
+    except xml.etree.ElementTree.ParseError as ex:
+        log.error('load_launchers_XML() (ParseError) Exception parsing {}'.format(db_file.getPath()))
+        log.error('load_launchers_XML() (ParseError) {}'.format(const.text_type(ex)))
+        categories.clear()
+        launchers.clear()
+    # log.debug('load_catfile() Loaded {} categories'.format(len(categories)))
+    # log.debug('load_catfile() Loaded {} launchers'.format(len(launchers)))
+
+# categories.xml is parsed incrementally, one category/launcher at a time.
+def _load_launchers_XML_elements(cfg, xml_path, __debug_parser):
+    categories = cfg.categories
+    launchers = cfg.launchers
+    for category_element in utils.iterparse_XML_root_children(xml_path):
         if __debug_parser: log.debug('Root child {}'.format(category_element.tag))
 
         if category_element.tag == 'control':
@@ -1072,10 +1088,7 @@ def load_launchers_XML(cfg):
 
             # Parse child tags of category
             for category_child in category_element:
-                # By default read strings
-                text_XML = category_child.text if category_child.text is not None else ''
-                text_XML = misc.unescape_XML(text_XML)
-                xml_tag  = category_child.tag
+                xml_tag, text_XML = category_child.tag, misc.unescape_XML(category_child.text or '')
                 if __debug_parser: log.debug('{} --> {}'.format(xml_tag, text_XML))
 
                 # Now transform data depending on tag name
@@ -1092,10 +1105,7 @@ def load_launchers_XML(cfg):
 
             # Parse child tags of category
             for category_child in category_element:
-                # By default read strings
-                text_XML = category_child.text if category_child.text is not None else ''
-                text_XML = misc.unescape_XML(text_XML)
-                xml_tag  = category_child.tag
+                xml_tag, text_XML = category_child.tag, misc.unescape_XML(category_child.text or '')
                 if __debug_parser: log.debug('{} --> {}'.format(xml_tag, text_XML))
 
                 if xml_tag == 'args_extra':
@@ -1117,8 +1127,6 @@ def load_launchers_XML(cfg):
                 else:
                     launcher[xml_tag] = text_XML
             launchers[launcher['id']] = launcher
-    # log.debug('load_catfile() Loaded {} categories'.format(len(categories)))
-    # log.debug('load_catfile() Loaded {} launchers'.format(len(launchers)))
 
 # -------------------------------------------------------------------------------------------------
 # Standard ROM databases
@@ -1260,10 +1268,7 @@ def load_VCategory_XML(roms_xml_file):
             # Default values
             VLauncher = {'id' : '', 'name' : '', 'rom_count' : '', 'roms_base_noext' : ''}
             for rom_child in root_element:
-                # By default read strings
-                text_XML = rom_child.text if rom_child.text is not None else ''
-                text_XML = misc.unescape_XML(text_XML)
-                xml_tag  = rom_child.tag
+                xml_tag, text_XML = rom_child.tag, misc.unescape_XML(rom_child.text or '')
                 if __debug_xml_parser: log.debug('{} --> {}'.format(xml_tag, text_XML))
                 VLauncher[xml_tag] = text_XML
             ret['vlaunchers'][VLauncher['id']] = VLauncher
@@ -1321,10 +1326,7 @@ def load_Collection_index_XML(xml_FN):
         elif root_element.tag == 'Collection':
             collection = new_collection()
             for rom_child in root_element:
-                # By default read Unicode strings.
-                text_XML = rom_child.text if rom_child.text is not None else ''
-                text_XML = misc.unescape_XML(text_XML)
-                xml_tag  = rom_child.tag
+                xml_tag, text_XML = rom_child.tag, misc.unescape_XML(rom_child.text or '')
                 if __debug_xml_parser: log.debug('{} --> {}'.format(xml_tag, text_XML))
                 collection[xml_tag] = text_XML
             ret['collections'][collection['id']] = collection
@@ -1423,9 +1425,7 @@ def export_ROM_collection_assets(out_dir_FN, collection, rom_list, asset_dir_FN)
         log.debug('{:<9s} P  COPY "{}"'.format(AInfo.name, asset_FN.getPath()))
         log.debug('{:<9s} P    TO "{}"'.format(AInfo.name, new_asset_FN.getPath()))
         try:
-            source_path = asset_FN.getPath().decode(get_fs_encoding(), 'ignore')
-            dest_path = new_asset_FN.getPath().decode(get_fs_encoding(), 'ignore')
-            shutil.copy(source_path, dest_path)
+            utils.copy_file(asset_FN.getPath(), new_asset_FN.getPath())
         except OSError:
             log.error('export_ROM_collection_assets() OSError exception copying image')
             kodi.notify_warn('OSError exception copying image')
@@ -1467,7 +1467,7 @@ def export_ROM_collection_assets(out_dir_FN, collection, rom_list, asset_dir_FN)
             log.debug('{:<9s} COPY "{}"'.format(AInfo.name, asset_FN.getPath()))
             log.debug('{:<9s}   TO "{}"'.format(AInfo.name, new_asset_FN.getPath()))
             try:
-                utils_copy_file(asset_FN.getPath(), new_asset_FN.getPath())
+                utils.copy_file(asset_FN.getPath(), new_asset_FN.getPath())
             except OSError:
                 log.error('export_ROM_collection_assets() OSError exception copying image')
                 kodi.notify_warn('OSError exception copying image')
@@ -1619,7 +1619,7 @@ def import_ROM_NFO(roms, romID, verbose = True):
     # We assume NFO files are UTF-8. Decode data to Unicode.
     #
     # Future work: ESRB and maybe nplayers fields must be sanitized.
-    nfo_str = utils_load_file_to_str(nfo_file_path).replace('\r', '').replace('\n', '')
+    nfo_str = utils.load_file_to_str(nfo_file_path).replace('\r', '').replace('\n', '')
 
     # Read XML tags in the NFO single-line string and edit fields in the ROM dictionary.
     update_dic_with_NFO_str(nfo_str, 'title', nfo_dic, 'm_name')
@@ -1650,7 +1650,7 @@ def import_ROM_NFO_file_scanner(NFO_FN):
     }
 
     # Read file, put in a string and remove line endings to get a single-line string.
-    nfo_str = utils_load_file_to_str(NFO_FN.getPath()).replace('\r', '').replace('\n', '')
+    nfo_str = utils.load_file_to_str(NFO_FN.getPath()).replace('\r', '').replace('\n', '')
 
     # Read XML tags in the NFO single-line string and edit fields in the ROM dictionary.
     update_dic_with_NFO_str(nfo_str, 'title', nfo_dic, 'title')
@@ -1701,7 +1701,7 @@ def import_launcher_NFO(nfo_FN, launchers, launcherID):
         return False
 
     # Read file, put in a single-line string and remove all line endings.
-    nfo_str = utils_load_file_to_str(nfo_FN.getPath()).replace('\r', '').replace('\n', '')
+    nfo_str = utils.load_file_to_str(nfo_FN.getPath()).replace('\r', '').replace('\n', '')
     update_dic_with_NFO_str(nfo_str, 'year', nfo_dic, 'm_year')
     update_dic_with_NFO_str(nfo_str, 'genre', nfo_dic, 'm_genre')
     update_dic_with_NFO_str(nfo_str, 'developer', nfo_dic, 'm_developer')
@@ -1727,7 +1727,7 @@ def read_launcher_NFO(nfo_FN):
         return nfo_dic
 
     # Read file, put it in a single-line string by removing all line endings.
-    nfo_str = utils_load_file_to_str(nfo_FN.getPath()).replace('\r', '').replace('\n', '')
+    nfo_str = utils.load_file_to_str(nfo_FN.getPath()).replace('\r', '').replace('\n', '')
     update_dic_with_NFO_str(nfo_str, 'year', nfo_dic, 'year')
     update_dic_with_NFO_str(nfo_str, 'genre', nfo_dic, 'genre')
     update_dic_with_NFO_str(nfo_str, 'developer', nfo_dic, 'developer')
@@ -1759,7 +1759,7 @@ def import_category_NFO(NFO_FN, edict):
         kodi.notify_warn('NFO file not found {}'.format(os.path.basename(NFO_FN.getPath())))
         log.error('import_category_NFO() Not found "{}"'.format(NFO_FN.getPath()))
         return False
-    nfo_str = utils_load_file_to_str(NFO_FN.getPath()).replace('\r', '').replace('\n', '')
+    nfo_str = utils.load_file_to_str(NFO_FN.getPath()).replace('\r', '').replace('\n', '')
     update_dic_with_NFO_str(nfo_str, 'year', edict, 'm_year')
     update_dic_with_NFO_str(nfo_str, 'genre', edict, 'm_genre')
     update_dic_with_NFO_str(nfo_str, 'developer', edict, 'm_developer')
@@ -1793,7 +1793,7 @@ def import_collection_NFO(nfo_FN, collections, launcherID):
         log.error("import_collection_NFO() Not found '{}'".format(nfo_FN.getPath()))
         return False
 
-    nfo_str = utils_load_file_to_str(nfo_FN.getPath()).replace('\r', '').replace('\n', '')
+    nfo_str = utils.load_file_to_str(nfo_FN.getPath()).replace('\r', '').replace('\n', '')
     update_dic_with_NFO_str(nfo_str, 'genre', nfo_dic, 'm_genre')
     update_dic_with_NFO_str(nfo_str, 'rating', nfo_dic, 'm_rating')
     update_dic_with_NFO_str(nfo_str, 'plot', nfo_dic, 'm_plot')
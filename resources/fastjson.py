@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2016-2022 Wintermute0110 <wintermute0110@gmail.com>
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; version 2 of the License.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+# See the GNU General Public License for more details.
+
+# Advanced Emulator/MAME Launcher JSON functions.
+#
+# Uses the fastest JSON library available: orjson, then ujson, then the standard library json.
+# orjson wheels are not available on all platforms Kodi runs on (Android, some ARM Linux), ujson
+# has a much wider coverage. orjson and ujson are optional, the standard library json is the
+# fallback. This module does not import any other AEL module.
+
+# --- Python standard library ---
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
+if orjson:
+    JSON_LIBRARY = 'orjson'
+elif ujson:
+    JSON_LIBRARY = 'ujson'
+else:
+    JSON_LIBRARY = 'json'
+
+# Decodes a JSON document. data can be a Unicode string or UTF-8 encoded bytes.
+# Raises ValueError (or a subclass) if the document is not valid JSON.
+if orjson:
+    loads = orjson.loads
+elif ujson:
+    loads = ujson.loads
+else:
+    loads = json.loads
+
+# Encodes obj into a compact JSON Unicode string.
+# orjson and ujson are configured to behave like json: non-string keys are converted to strings
+# and forward slashes are not escaped.
+def dumps(obj):
+    if orjson:
+        return orjson.dumps(obj, option = orjson.OPT_NON_STR_KEYS).decode('utf-8')
+    elif ujson:
+        return ujson.dumps(obj, ensure_ascii = False, escape_forward_slashes = False)
+    return json.dumps(obj, ensure_ascii = False, separators = (',', ':'))
+
+# Encodes obj into UTF-8 bytes with the keys sorted. Used for the databases and disk caches.
+# If indent is None the JSON is compact, with no whitespace, and the fastest library is used.
+# Indented JSON is written with the standard library json, orjson only supports an indentation
+# of 2 spaces and ujson has no separators parameter.
+def dumps_sorted_bytes(obj, indent = None, separators = (', ', ': ')):
+    if indent is not None:
+        json_str = json.dumps(obj, ensure_ascii = False, sort_keys = True,
+            indent = indent, separators = separators)
+    elif orjson:
+        return orjson.dumps(obj, option = orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS)
+    elif ujson:
+        json_str = ujson.dumps(obj, ensure_ascii = False, sort_keys = True,
+            escape_forward_slashes = False)
+    else:
+        json_str = json.dumps(obj, ensure_ascii = False, sort_keys = True, separators = (',', ':'))
+    return json_str.encode('utf-8')
@@ -365,7 +365,7 @@ class ProgressDialog(object):
             else:
                 self.progressDialog.update(int(self.progress))
         else:
-            if type(message) is not text_type: raise TypeError
+            if not isinstance(message, const.text_type): raise TypeError
             self.message = message
             if utils.kodi_running_version >= utils.KODI_VERSION_MATRIX:
                 self.progressDialog.update(self.progress, self.message)
@@ -386,7 +386,7 @@ class ProgressDialog(object):
             else:
                 self.progressDialog.update(int(self.progress))
         else:
-            if type(message) is not text_type: raise TypeError
+            if not isinstance(message, const.text_type): raise TypeError
             self.message = message
             if utils.kodi_running_version >= utils.KODI_VERSION_MATRIX:
                 self.progressDialog.update(self.progress, self.message)
@@ -396,7 +396,7 @@ class ProgressDialog(object):
     # Update dialog message but keep same progress.
     def updateMessage(self, message):
         if not self.dialog_active: raise TypeError
-        if type(message) is not text_type: raise TypeError
+        if not isinstance(message, const.text_type): raise TypeError
         self.message = message
         if utils.kodi_running_version >= utils.KODI_VERSION_MATRIX:
             self.progressDialog.update(self.progress, self.message)
@@ -56,6 +56,7 @@ import traceback
 if const.ADDON_RUNNING_PYTHON_2:
     import urlparse
 elif const.ADDON_RUNNING_PYTHON_3:
+    import concurrent.futures
     import urllib.parse
 else:
     raise TypeError('Undefined Python runtime version.')
@@ -2812,7 +2813,7 @@ def command_import_collection(self):
         log.debug('{:<9s} COPY "{}"'.format(AInfo.name, in_asset_FN.getPath()))
         log.debug('{:<9s}   TO "{}"'.format(AInfo.name, new_asset_FN.getPath()))
         try:
-            utils_copy_file(in_asset_FN.getPath(), new_asset_FN.getPath())
+            utils.copy_file(in_asset_FN.getPath(), new_asset_FN.getPath())
         except OSError:
             log.error('fs_export_ROM_collection_assets() OSError exception copying image')
             kodi_notify_warn('OSError exception copying image')
@@ -2855,7 +2856,7 @@ def command_import_collection(self):
             log.debug('{:<9s} COPY "{}"'.format(AInfo.name, in_asset_FN.getPath()))
             log.debug('{:<9s}   TO "{}"'.format(AInfo.name, new_asset_FN.getPath()))
             try:
-                utils_copy_file(in_asset_FN.getPath(), new_asset_FN.getPath())
+                utils.copy_file(in_asset_FN.getPath(), new_asset_FN.getPath())
             except OSError:
                 log.error('fs_export_ROM_collection_assets() OSError exception copying image')
                 kodi_notify_warn('OSError exception copying image')
@@ -3701,11 +3702,8 @@ def command_edit_launcher_build_menu(cfg, categoryID, launcherID):
     toggle_window_str = 'ON' if launcher['toggle_window'] else 'OFF'
     non_blocking_str = 'ON' if launcher['non_blocking'] else 'OFF'
     multidisc_str = 'ON' if launcher['multidisc'] else 'OFF'
-    if launcher['application'] == const.RETROPLAYER_LAUNCHER_APP_NAME:
-        application_str = 'Kodi Retroplayer'
-    elif launcher['application'] == const.LNK_LAUNCHER_APP_NAME:
-        application_str = 'LNK Launcher'
-    else:
+    application_str = const.SPECIAL_LAUNCHER_APP_NAMES.get(launcher['application'])
+    if application_str is None:
         application_str = "'{}'".format(launcher['application'])
 
     # "Audit/Display Mode" submenu.
@@ -5257,13 +5255,13 @@ def command_view_menu(cfg, categoryID, launcherID, romID):
         try:
             if action == ACTION_VIEW_LAUNCHER_STATS:
                 window_title = 'Launcher "{}" Statistics Report'.format(launcher['m_name'])
-                info_text = utils_load_file_to_str(report_stats_FN.getPath())
+                info_text = utils.load_file_to_str(report_stats_FN.getPath())
             elif action == ACTION_VIEW_LAUNCHER_METADATA:
                 window_title = 'Launcher "{}" Metadata Report'.format(launcher['m_name'])
-                info_text = utils_load_file_to_str(report_meta_FN.getPath())
+                info_text = utils.load_file_to_str(report_meta_FN.getPath())
             elif action == ACTION_VIEW_LAUNCHER_ASSETS:
                 window_title = 'Launcher "{}" Asset Report'.format(launcher['m_name'])
-                info_text = utils_load_file_to_str(report_assets_FN.getPath())
+                info_text = utils.load_file_to_str(report_assets_FN.getPath())
         except IOError:
             log.error('command_view_menu() (IOError) Exception reading report TXT file')
             window_title = 'Error'
@@ -7476,9 +7474,10 @@ def exec_utils_check_retro_BIOS(cfg):
     # 5) Write results into a report TXT file.
     BIOS_status_dic = {}
     BIOS_status_dic_colour = {}
+    BIOS_hash_list = []
     pDialog = KodiProgressDialog()
-    pDialog.startProgress('Checking Retroarch BIOSes...', len(Libretro_BIOS_list))
-    for BIOS_dic in Libretro_BIOS_list:
+    pDialog.startProgress('Checking Retroarch BIOSes...', len(audit.Libretro_BIOS_list))
+    for BIOS_dic in audit.Libretro_BIOS_list:
         pDialog.updateProgressInc()
 
         if check_only_mandatory and not BIOS_dic['mandatory']:
@@ -7494,25 +7493,66 @@ def exec_utils_check_retro_BIOS(cfg):
             BIOS_status_dic_colour[BIOS_dic['filename']] = '[COLOR orange]Not found[/COLOR]'
             continue
 
+        # Checking the size is much cheaper than computing the MD5, only files with the right
+        # size are hashed. Size -1 means the size is unknown, check the MD5 only.
         BIOS_stat = BIOS_file_FN.stat()
         file_size = BIOS_stat.st_size
-        if file_size != BIOS_dic['size']:
+        if BIOS_dic['size'] >= 0 and file_size != BIOS_dic['size']:
             log.info('Wrong size "{}"'.format(BIOS_file_FN.getPath()))
             log.info('It is {} and must be {}'.format(file_size, BIOS_dic['size']))
             BIOS_status_dic[BIOS_dic['filename']] = 'Wrong size'
             BIOS_status_dic_colour[BIOS_dic['filename']] = '[COLOR orange]Wrong size[/COLOR]'
             continue
 
-        hash_md5 = hashlib.md5()
-        with open(BIOS_file_FN.getPath(), "rb") as f:
-            for chunk in iter(lambda: f.read(4096), b""):
-                hash_md5.update(chunk)
-        file_MD5 = hash_md5.hexdigest()
+        # Some BIOSes have no known MD5 ('' or '0'), the file is not hashed.
+        if not BIOS_dic['md5'] or BIOS_dic['md5'] == '0':
+            log.info('BIOS OK (no MD5) "{}"'.format(BIOS_file_FN.getPath()))
+            BIOS_status_dic[BIOS_dic['filename']] = 'OK (no MD5)'
+            BIOS_status_dic_colour[BIOS_dic['filename']] = '[COLOR lime]OK (no MD5)[/COLOR]'
+            continue
+
+        BIOS_hash_list.append((BIOS_dic, BIOS_file_FN))
+    pDialog.endProgress()
+
+    # Compute the MD5 of the BIOSes found. Reading files is I/O bound and hashlib releases the
+    # GIL, so the files are hashed in parallel. concurrent.futures is not available in Python 2.
+    # A file that cannot be read gets a MD5 of None and is reported, the check goes on.
+    pDialog.startProgress('Computing BIOS MD5 checksums...', len(BIOS_hash_list))
+    BIOS_MD5_dic = {}
+    if const.ADDON_RUNNING_PYTHON_3:
+        with concurrent.futures.ThreadPoolExecutor(max_workers = 8) as executor:
+            future_dic = {
+                executor.submit(misc.calculate_file_MD5, BIOS_file_FN.getPath()) : BIOS_dic['filename']
+                for BIOS_dic, BIOS_file_FN in BIOS_hash_list
+            }
+            for future in concurrent.futures.as_completed(future_dic):
+                pDialog.updateProgressInc()
+                try:
+                    BIOS_MD5_dic[future_dic[future]] = future.result()
+                except (IOError, OSError):
+                    BIOS_MD5_dic[future_dic[future]] = None
+    else:
+        for BIOS_dic, BIOS_file_FN in BIOS_hash_list:
+            pDialog.updateProgressInc()
+            try:
+                BIOS_MD5_dic[BIOS_dic['filename']] = misc.calculate_file_MD5(BIOS_file_FN.getPath())
+            except (IOError, OSError):
+                BIOS_MD5_dic[BIOS_dic['filename']] = None
+    for BIOS_dic, BIOS_file_FN in BIOS_hash_list:
+        file_MD5 = BIOS_MD5_dic[BIOS_dic['filename']]
         log.debug('MD5 is "{}"'.format(file_MD5))
+        if file_MD5 is None:
+            log.error('Cannot read "{}"'.format(BIOS_file_FN.getPath()))
+            BIOS_status_dic[BIOS_dic['filename']] = 'Read error'
+            BIOS_status_dic_colour[BIOS_dic['filename']] = '[COLOR red]Read error[/COLOR]'
+            continue
         if file_MD5 != BIOS_dic['md5']:
             log.info('Wrong MD5 "{}"'.format(BIOS_file_FN.getPath()))
             log.info('It is       "{}"'.format(file_MD5))
             log.info('and must be "{}"'.format(BIOS_dic['md5']))
+            if file_MD5 in audit.BIOS_BY_MD5:
+                for matched_BIOS_dic in audit.BIOS_BY_MD5[file_MD5]:
+                    log.info('MD5 matches BIOS "{}"'.format(matched_BIOS_dic['filename']))
             BIOS_status_dic[BIOS_dic['filename']] = 'Wrong MD5'
             BIOS_status_dic_colour[BIOS_dic['filename']] = '[COLOR orange]Wrong MD5[/COLOR]'
             continue
@@ -7528,10 +7568,7 @@ def exec_utils_check_retro_BIOS(cfg):
     #    7800 BIOS (E).rom     NO         Wrong MD5   core a name
     #                                                 core b name
     #    7800 BIOS (U).rom     YES        OK          ---
-    max_size_BIOS_filename = 0
-    for BIOS_dic in Libretro_BIOS_list:
-        if len(BIOS_dic['filename']) > max_size_BIOS_filename:
-            max_size_BIOS_filename = len(BIOS_dic['filename'])
+    max_size_BIOS_filename = max(len(BIOS_filename) for BIOS_filename in audit.BIOS_BY_FILENAME)
 
     max_size_status = 0
     for key in BIOS_status_dic:
@@ -7552,7 +7589,7 @@ def exec_utils_check_retro_BIOS(cfg):
     slist.append('{}  {}  {}  {}'.format(bios_str, mandatory_str, status_str, cores_str))
     slist.append('{}'.format('-' * size_total))
 
-    for BIOS_dic in Libretro_BIOS_list:
+    for BIOS_dic in audit.Libretro_BIOS_list:
         BIOS_filename = BIOS_dic['filename']
         # If BIOS was skipped continue loop
         if BIOS_filename not in BIOS_status_dic: continue
@@ -8084,9 +8121,8 @@ def command_run_rom(self, categoryID, launcherID, romID):
     log.info('_command_run_rom() romext       "{}"'.format(romext))
 
     # --- Check for errors and abort if found --- todo: CHECK
-    if not application.exists() and (
-        application.getOriginalPath() != RETROPLAYER_LAUNCHER_APP_NAME and
-        application.getOriginalPath() != LNK_LAUNCHER_APP_NAME ):
+    if not application.exists() and \
+        application.getOriginalPath() not in const.SPECIAL_LAUNCHER_APP_NAMES:
         log.error('Launching app not found "{}"'.format(application.getPath()))
         kodi_notify_warn('Launching app not found {}'.format(application.getOriginalPath()))
         return
@@ -8697,7 +8733,7 @@ def command_rom_scanner(self, launcherID):
 
         # --- Check if ROM belongs to a multidisc set ---
         MultiDiscInROMs = False
-        MDSet = get_multidisc_info(ROM)
+        MDSet = md.get_multidisc_info(ROM)
         if MDSet.isMultiDisc and launcher_multidisc:
             log.debug('ROM belongs to a multidisc set.')
             log.debug('isMultiDisc "{}"'.format(MDSet.isMultiDisc))
@@ -21,37 +21,13 @@ import resources.log as log
 import re
 
 # --- BEGIN code in dev-core/test_multidisc_parser.py --------------------------------------------
+# Called for every ROM when scanning, the regex is compiled once.
+_ROM_TOKENS_RE = re.compile(r'\[.+?\]|\(.+?\)|\{.+?\}|[^\[\(\{]+')
 def get_ROM_basename_tokens(basename_str):
-    DEBUG_TOKEN_PARSER = False
-
-    # --- Parse ROM base_noext/basename_str into tokens ---
-    reg_exp = '\[.+?\]|\(.+?\)|\{.+?\}|[^\[\(\{]+'
-    tokens_raw = re.findall(reg_exp, basename_str)
-    if DEBUG_TOKEN_PARSER:
-        log.debug('get_ROM_basename_tokens() tokens_raw   {}'.format(tokens_raw))
-
-    # Strip tokens
-    tokens_strip = list()
-    for token in tokens_raw: tokens_strip.append(token.strip())
-    if DEBUG_TOKEN_PARSER:
-        log.debug('get_ROM_basename_tokens() tokens_strip {}'.format(tokens_strip))
-
-    # Remove empty tokens ''
-    tokens_clean = list()
-    for token in tokens_strip:
-        if token: tokens_clean.append(token)
-    if DEBUG_TOKEN_PARSER:
-        log.debug('get_ROM_basename_tokens() tokens_clean {}'.format(tokens_clean))
-
-    # Remove '-' tokens from Trurip multidisc names
-    tokens = list()
-    for token in tokens_clean:
-        if token == '-': continue
-        tokens.append(token)
-    if DEBUG_TOKEN_PARSER:
-        log.debug('get_ROM_basename_tokens() tokens       {}'.format(tokens))
-
-    return tokens
+    # Parse ROM base_noext/basename_str into tokens, strip them and remove empty tokens ''
+    # and the '-' tokens of Trurip multidisc names, all in one pass.
+    tokens_strip = (token.strip() for token in _ROM_TOKENS_RE.findall(basename_str))
+    return [token for token in tokens_strip if token and token != '-']
 
 class MultiDiscInfo:
     def __init__(self, ROM_FN):
@@ -62,13 +38,16 @@ class MultiDiscInfo:
         self.extension   = ROM_FN.getExt()
         self.order       = 0
 
+# Redump '(Disc 1)' and TOSEC/Trurip '(Disc 1 of 2)' disc tokens. Group 2 is None for Redump.
+_DISC_TOKEN_RE = re.compile(r'\(Dis[ck] ([0-9]+)(?: of ([0-9]+))?\)')
+
 def get_multidisc_info(ROM_FN):
     DEBUG_FUNCTION = False
     MDSet = MultiDiscInfo(ROM_FN)
 
     # --- Parse ROM basenoext into tokens ---
     tokens = get_ROM_basename_tokens(ROM_FN.getBaseNoExt())
-    if DEBUG_FUNCTION: log.debug('tokens: {}'.format(text_type(tokens)))
+    if DEBUG_FUNCTION: log.debug('tokens: {}'.format(const.text_type(tokens)))
 
     # --- Check if ROM belongs to a multidisc set and get set name and order ---
     # Algortihm:
@@ -77,28 +56,17 @@ def get_multidisc_info(ROM_FN):
     # 3) Define the set basename by removing the multidisk token
     MultDiscFound = False
     for index, token in enumerate(tokens):
-        # --- Redump ---
-        matchObj = re.match(r'\(Dis[ck] ([0-9]+)\)', token)
-        if matchObj:
+        matchObj = _DISC_TOKEN_RE.match(token)
+        if not matchObj: continue
+        if matchObj.group(2) is None:
             log.debug('get_multidisc_info() ### Matched Redump multidisc ROM ###')
-            tokens_nodisc_idx = list(range(0, len(tokens)))
-            tokens_nodisc_idx.remove(index)
-            tokens_mdisc = [tokens[x] for x in tokens_nodisc_idx]
-            MultDiscFound = True
-            break
-
-        # --- TOSEC/Trurip ---
-        matchObj = re.match(r'\(Dis[ck] ([0-9]+) of ([0-9]+)\)', token)
-        if matchObj:
+        else:
             log.debug('get_multidisc_info() ### Matched TOSEC/Trurip multidisc ROM ###')
-            tokens_nodisc_idx = list(range(0, len(tokens)))
-            tokens_nodisc_idx.remove(index)
             if DEBUG_FUNCTION:
                 log.debug('get_multidisc_info() index              = {}'.format(index))
-                log.debug('get_multidisc_info() tokens_nodisc_idx  = {}'.format(tokens_nodisc_idx))
-            tokens_mdisc = [tokens[x] for x in tokens_nodisc_idx]
-            MultDiscFound = True
-            break
+        tokens_mdisc = tokens[:index] + tokens[index+1:]
+        MultDiscFound = True
+        break
 
     if MultDiscFound:
         MDSet.isMultiDisc = True
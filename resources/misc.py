@@ -25,8 +25,8 @@ import resources.log as log
 # --- Python standard library ---
 import collections
 import hashlib
+import mmap
 import os
-import random
 import re
 import string
 import time
@@ -35,7 +35,8 @@ if const.ADDON_RUNNING_PYTHON_2:
     import HTMLParser
     import urlparse
 elif const.ADDON_RUNNING_PYTHON_3:
-    import html.parser
+    import html
+    import secrets
     import urllib.parse
 else:
     raise TypeError('Undefined Python runtime version.')
@@ -43,22 +44,23 @@ else:
 # -------------------------------------------------------------------------------------------------
 # Strings and text functions.
 # -------------------------------------------------------------------------------------------------
+# Kodi colour tags [COLOR colorname] and [/COLOR], removed in a single pass.
+_COLOR_TAGS_RE = re.compile(r'\[COLOR \w+?\]|\[/COLOR\]')
+
 # Limits the length of a string for printing. If max_length == -1 do nothing (string has no
 # length limit). The string is trimmed by cutting it and adding three dots ... at the end.
 # Including these three dots the length of the returned string is max_length or less.
 # Example: 'asdfasdfdasf' -> 'asdfsda...'
 def limit_string(string, max_length):
-    if max_length > 5 and len(string) > max_length:
-        string = string[0:max_length-3] + '...'
-    return string
+    return string[:max_length-3] + '...' if 5 < max_length < len(string) else string
 
 # Given a Category/Launcher name clean it so the cleaned srt can be used as a filename.
 #  1) Convert any non-printable character into '_'
 #  2) Convert spaces ' ' into '_'
+# Both steps are done in a single regex pass.
+_FILENAME_UNSAFE_RE = re.compile('[^{}]'.format(re.escape(string.printable.replace(' ', ''))))
 def title_to_filename_str(title_str):
-    cleaned_str_1 = ''.join([i if i in string.printable else '_' for i in title_str])
-    cleaned_str_2 = cleaned_str_1.replace(' ', '_')
-    return cleaned_str_2
+    return _FILENAME_UNSAFE_RE.sub('_', title_str)
 
 # Writes a XML text tag line, indented 2 spaces by default.
 # Both tag_name and tag_text must be Unicode strings.
@@ -97,19 +99,9 @@ def remove_Kodi_color_tags(s):
 
 # Renders a list of list of strings table into a CSV list of strings.
 # The list of strings must be joined with '\n'.join()
+# The first row (column alignment) is skipped.
 def render_table_CSV(table_str):
-    rows = len(table_str)
-    cols = len(table_str[0])
-    table_str_list = []
-    for i in range(1, rows):
-        row_str = ''
-        for j in range(cols):
-            if j < cols - 1:
-                row_str += '{},'.format(table_str[i][j])
-            else:
-                row_str += '{}'.format(table_str[i][j])
-        table_str_list.append(row_str)
-    return table_str_list
+    return [','.join(['{}'.format(cell) for cell in row]) for row in table_str[1:]]
 
 # Returns a list of strings that must be joined with '\n'.join()
 #
@@ -140,49 +132,35 @@ def render_table(table_str, trim_Kodi_colours = False):
                 new_table_str[i].append(s)
         table_str = new_table_str
 
-    # Determine sizes and padding.
-    # Ignore row 0 when computing sizes.
-    table_str_list = []
-    col_sizes = get_table_str_col_sizes(table_str, rows, cols)
-    col_padding = table_str[0]
+    return TableFormatter(table_str[0], table_str[1]).render(table_str[2:])
 
-    # Table first horizontal line -----
-    total_size = sum(col_sizes) + 2*(cols-1)
-    table_str_list.append('{}'.format('-' * total_size))
-
-    # --- Table header ---
-    row_str = ''
-    for j in range(cols):
-        if j < cols - 1:
-            row_str += print_padded_left(table_str[1][j], col_sizes[j]) + '  '
-        else:
-            row_str += print_padded_left(table_str[1][j], col_sizes[j])
-    table_str_list.append(row_str)
-
-    # Separation between table header and rows. Table line -----
-    total_size = sum(col_sizes) + 2*(cols-1)
-    table_str_list.append('{}'.format('-' * total_size))
-
-    # --- Data rows ---
-    for i in range(2, rows):
-        row_str = ''
-        for j in range(cols):
-            if j < cols - 1:
-                if col_padding[j] == 'right':
-                    row_str += print_padded_right(table_str[i][j], col_sizes[j]) + '  '
-                else:
-                    row_str += print_padded_left(table_str[i][j], col_sizes[j]) + '  '
-            else:
-                if col_padding[j] == 'right':
-                    row_str += print_padded_right(table_str[i][j], col_sizes[j])
-                else:
-                    row_str += print_padded_left(table_str[i][j], col_sizes[j])
-        table_str_list.append(row_str)
-
-    # Table final horizontal line -----
-    total_size = sum(col_sizes) + 2*(cols-1)
-    table_str_list.append('{}'.format('-' * total_size))
-    return table_str_list
+# Renders tables with a fixed column alignment and header. The alignment and header are
+# processed once when the object is created and reused every time a table is rendered.
+# Column widths depend on the data so they are computed in every call to render().
+# The Kodi colour tags are not removed, use render_table() for that.
+#
+# tf = TableFormatter(['left', 'left', 'left'], ['Type', 'Region', 'Format'])
+# print('\n'.join(tf.render(rows)))
+class TableFormatter(object):
+    def __init__(self, align_list, header_list):
+        self.align_chars = ['>' if align == 'right' else '<' for align in align_list]
+        self.header_list = ['{}'.format(h) for h in header_list]
+        self.header_sizes = [len(h) for h in self.header_list]
+
+    # Returns a list of strings that must be joined with '\n'.join()
+    def render(self, rows):
+        col_sizes = list(self.header_sizes)
+        if rows:
+            data_sizes = get_table_str_col_sizes([None] + rows, len(rows) + 1, len(col_sizes))
+            col_sizes = [max(h, d) for h, d in zip(col_sizes, data_sizes)]
+        # The header is always left aligned. Last column is padded like the others.
+        header_fmt = '  '.join('{{:<{}}}'.format(size) for size in col_sizes)
+        row_fmt = '  '.join('{{:{}{}}}'.format(a, size) for a, size in zip(self.align_chars, col_sizes))
+        line_str = '-' * (sum(col_sizes) + 2 * (len(col_sizes) - 1))
+        table_str_list = [line_str, header_fmt.format(*self.header_list), line_str]
+        table_str_list.extend(row_fmt.format(*['{}'.format(c) for c in row]) for row in rows)
+        table_str_list.append(line_str)
+        return table_str_list
 
 # First row             column aligment 'right' or 'left'
 # Second and next rows  table data
@@ -208,75 +186,61 @@ def render_table_NO_HEADER(table_str, trim_Kodi_colours = False):
         for i in range(rows):
             new_table_str.append([])
             for j in range(cols):
-                s = text_remove_Kodi_color_tags(table_str[i][j])
+                s = remove_Kodi_color_tags(table_str[i][j])
                 new_table_str[i].append(s)
         table_str = new_table_str
 
     # Ignore row 0 when computing sizes.
-    table_str_list = []
-    col_sizes = text_get_table_str_col_sizes(table_str, rows, cols)
-    col_padding = table_str[0]
+    # The padding function of every column is chosen once, not for every cell.
+    col_sizes = get_table_str_col_sizes(table_str, rows, cols)
+    pad_fns = [print_padded_right if align == 'right' else print_padded_left for align in table_str[0]]
 
     # --- Data rows ---
+    table_str_list = []
     for i in range(1, rows):
-        row_str = ''
-        for j in range(cols):
-            if j < cols - 1:
-                if col_padding[j] == 'right':
-                    row_str += text_print_padded_right(table_str[i][j], col_sizes[j]) + '  '
-                else:
-                    row_str += text_print_padded_left(table_str[i][j], col_sizes[j]) + '  '
-            else:
-                if col_padding[j] == 'right':
-                    row_str += text_print_padded_right(table_str[i][j], col_sizes[j])
-                else:
-                    row_str += text_print_padded_left(table_str[i][j], col_sizes[j])
-        table_str_list.append(row_str)
+        table_str_list.append('  '.join(
+            pad_fn(cell_str, col_size) for pad_fn, cell_str, col_size in zip(pad_fns, table_str[i], col_sizes)
+        ))
 
     return table_str_list
 
 # Removed Kodi colour tags before computing size (substitute by ''):
 #   A) [COLOR skyblue]
 #   B) [/COLOR]
+#
+# Only the length of the cell without tags is needed, so the length of the tags is subtracted
+# instead of building a copy of the cell without them. Most cells have no tags at all.
+#
+# Rows are transposed with zip() so the width of each column is a single max() reduction.
+# NumPy is not available in Kodi so np.char.str_len() cannot be used here.
+def _table_cell_size(cell_str):
+    cell_str = '{}'.format(cell_str)
+    if '[' not in cell_str: return len(cell_str)
+    return len(cell_str) - sum(m.end() - m.start() for m in _COLOR_TAGS_RE.finditer(cell_str))
+
 def get_table_str_col_sizes(table_str, rows, cols):
-    col_sizes = [0] * cols
-    for j in range(cols):
-        col_max_size = 0
-        for i in range(1, rows):
-            cell_str = re.sub(r'\[COLOR \w+?\]', '', table_str[i][j])
-            cell_str = re.sub(r'\[/COLOR\]', '', cell_str)
-            str_size = len('{}'.format(cell_str))
-            if str_size > col_max_size: col_max_size = str_size
-        col_sizes[j] = col_max_size
+    if rows < 2: return [0] * cols
+    col_sizes = [
+        max(_table_cell_size(cell_str) for cell_str in column)
+        for column in zip(*table_str[1:rows])
+    ]
 
     return col_sizes
 
+# max() with the default keyword is Python 3 only so an empty list is handled with [0].
 def str_list_size(str_list):
-    max_str_size = 0
-    for str_item in str_list:
-        str_size = len('{}'.format(str_item))
-        if str_size > max_str_size: max_str_size = str_size
-    return max_str_size
+    return max([len('{}'.format(str_item)) for str_item in str_list] or [0])
 
 def str_dic_max_size(dictionary_list, dic_key, title_str = ''):
-    max_str_size = 0
-    for item in dictionary_list:
-        str_size = len('{}'.format(item[dic_key]))
-        if str_size > max_str_size: max_str_size = str_size
-    if title_str:
-        str_size = len(title_str)
-        if str_size > max_str_size: max_str_size = str_size
-    return max_str_size
+    str_sizes = [len('{}'.format(item[dic_key])) for item in dictionary_list]
+    str_sizes.append(len(title_str))
+    return max(str_sizes)
 
 def print_padded_left(text_line, text_max_size):
-    formatted_str = '{}'.format(text_line)
-    padded_str =  formatted_str + ' ' * (text_max_size - len(formatted_str))
-    return padded_str
+    return '{}'.format(text_line).ljust(text_max_size)
 
 def print_padded_right(text_line, text_max_size):
-    formatted_str = '{}'.format(text_line)
-    padded_str = ' ' * (text_max_size - len(formatted_str)) + formatted_str
-    return padded_str
+    return '{}'.format(text_line).rjust(text_max_size)
 
 # --- BEGIN code in dev-misc/test_color_tag_remove.py ---------------------------------------------
 def remove_color_tags_slist(slist):
@@ -286,25 +250,9 @@ def remove_color_tags_slist(slist):
     #
     # Modifying a list is OK when iterating the list. However, do not change the size of the
     # list when iterating.
+    color_sub = _COLOR_TAGS_RE.sub
     for i, s in enumerate(slist):
-        s_temp, modified = s, False
-
-        # Remove all [COLOR colorname] tags.
-        fa_list = re.findall('(\[COLOR \w+?\])', s_temp)
-        fa_set = set(fa_list)
-        if len(fa_set) > 0:
-            modified = True
-            for m in fa_set:
-                s_temp = s_temp.replace(m, '')
-
-        # Remove all [/COLOR]
-        if s_temp.find('[/COLOR]') >= 0:
-            s_temp = s_temp.replace('[/COLOR]', '')
-            modified = True
-
-        # Update list
-        if modified:
-            slist[i] = s_temp
+        slist[i] = color_sub('', s)
 # --- END code in dev-misc/test_color_tag_remove.py -----------------------------------------------
 
 # Some XML encoding of special characters:
@@ -314,66 +262,78 @@ def remove_color_tags_slist(slist):
 # See https://wiki.python.org/moin/EscapingXml
 # See https://github.com/python/cpython/blob/master/Lib/xml/sax/saxutils.py
 # See http://stackoverflow.com/questions/2265966/xml-carriage-return-encoding
-def escape_XML(data_str):
-    # Ampersand MUST BE replaced FIRST
-    data_str = data_str.replace('&', '&amp;')
-    data_str = data_str.replace('>', '&gt;')
-    data_str = data_str.replace('<', '&lt;')
-
-    data_str = data_str.replace("'", '&apos;')
-    data_str = data_str.replace('"', '&quot;')
-
+# All characters are replaced in a single pass so the order of the replacements does not matter.
+_XML_ESCAPE_TABLE = {
+    ord('&') : '&amp;',
+    ord('>') : '&gt;',
+    ord('<') : '&lt;',
+    ord("'") : '&apos;',
+    ord('"') : '&quot;',
     # --- Unprintable characters ---
-    data_str = data_str.replace('\n', '&#10;')
-    data_str = data_str.replace('\r', '&#13;')
-    data_str = data_str.replace('\t', '&#9;')
-
-    return data_str
+    ord('\n') : '&#10;',
+    ord('\r') : '&#13;',
+    ord('\t') : '&#9;',
+}
+_XML_UNESCAPE_DIC = {
+    '&quot;' : '"',
+    '&apos;' : "'",
+    '&lt;'   : '<',
+    '&gt;'   : '>',
+    '&amp;'  : '&',
+    '&#10;'  : '\n',
+    '&#13;'  : '\r',
+    '&#9;'   : '\t',
+}
+_XML_UNESCAPE_RE = re.compile('|'.join(map(re.escape, _XML_UNESCAPE_DIC)))
+
+# In Python 2 ElementTree returns str instead of unicode for ASCII text, text_type() makes
+# sure translate() gets a Unicode string.
+def escape_XML(data_str):
+    return const.text_type(data_str).translate(_XML_ESCAPE_TABLE)
 
 def unescape_XML(data_str):
-    data_str = data_str.replace('&quot;', '"')
-    data_str = data_str.replace('&apos;', "'")
-
-    data_str = data_str.replace('&lt;', '<')
-    data_str = data_str.replace('&gt;', '>')
-    # Ampersand MUST BE replaced LAST
-    data_str = data_str.replace('&amp;', '&')
-
-    # --- Unprintable characters ---
-    data_str = data_str.replace('&#10;', '\n')
-    data_str = data_str.replace('&#13;', '\r')
-    data_str = data_str.replace('&#9;', '\t')
-
-    return data_str
+    return _XML_UNESCAPE_RE.sub(lambda m: _XML_UNESCAPE_DIC[m.group()], data_str)
 
 # Unquote an HTML string. Replaces %xx with Unicode characters.
 # http://www.w3schools.com/tags/ref_urlencode.asp
+_HTML_DECODE_DIC = {
+    '%25' : '%',
+    '%20' : ' ',
+    '%23' : '#',
+    '%26' : '&',
+    '%28' : '(',
+    '%29' : ')',
+    '%2C' : ',',
+    '%2F' : '/',
+    '%3B' : ';',
+    '%3A' : ':',
+    '%3D' : '=',
+    '%3F' : '?',
+}
+_HTML_DECODE_RE = re.compile('|'.join(_HTML_DECODE_DIC))
+
 def decode_HTML(s):
-    s = s.replace('%25', '%') # Must be done first
-    s = s.replace('%20', ' ')
-    s = s.replace('%23', '#')
-    s = s.replace('%26', '&')
-    s = s.replace('%28', '(')
-    s = s.replace('%29', ')')
-    s = s.replace('%2C', ',')
-    s = s.replace('%2F', '/')
-    s = s.replace('%3B', ';')
-    s = s.replace('%3A', ':')
-    s = s.replace('%3D', '=')
-    s = s.replace('%3F', '?')
-    return s
+    return _HTML_DECODE_RE.sub(lambda m: _HTML_DECODE_DIC[m.group()], s)
 
 # Decodes HTML <br> tags and HTML entities (&xxx;) into Unicode characters.
 # See https://stackoverflow.com/questions/2087370/decode-html-entities-in-python-string
+#
+# <br>, <br/> and <br /> are replaced in one regex pass.
+_HTML_BR_RE = re.compile(r'<br ?/?>')
+if const.ADDON_RUNNING_PYTHON_2:
+    _unescape_HTML_entities = HTMLParser.HTMLParser().unescape
+elif const.ADDON_RUNNING_PYTHON_3:
+    _unescape_HTML_entities = html.unescape
+else:
+    raise TypeError('Undefined Python runtime version.')
+
 def unescape_HTML(s):
     __debug_text_unescape_HTML = False
     if __debug_text_unescape_HTML:
-        log.debug('text_unescape_HTML() input  "{}"'.format(s))
+        log.debug('unescape_HTML() input  "{}"'.format(s))
 
     # --- Replace HTML tag characters by their Unicode equivalent ---
-    s = s.replace('<br>',   '\n')
-    s = s.replace('<br/>',  '\n')
-    s = s.replace('<br />', '\n')
+    s = _HTML_BR_RE.sub('\n', s)
 
     # --- HTML entities ---
     # s = s.replace('&lt;',   '<')
@@ -399,27 +359,24 @@ def unescape_HTML(s):
     # s = s.replace('&#x16b;', "ū")
     # s = s.replace('&#x16B;', "ū")
 
-    # Use HTMLParser module to decode HTML entities.
-    if const.ADDON_RUNNING_PYTHON_2:
-        s = HTMLParser.HTMLParser().unescape(s)
-    elif const.ADDON_RUNNING_PYTHON_3:
-        s = html.parser.HTMLParser().unescape(s)
-    else:
-        raise TypeError('Undefined Python runtime version.')
+    # Decode HTML entities. HTMLParser.unescape() was removed in Python 3.9, html.unescape()
+    # is the replacement.
+    s = _unescape_HTML_entities(s)
 
     if __debug_text_unescape_HTML:
-        log.debug('text_unescape_HTML() output "{}"'.format(s))
+        log.debug('unescape_HTML() output "{}"'.format(s))
     return s
 
 # Remove HTML tags from string.
+# The negated character class never backtracks. Like the old '<.*?>' it does not match across
+# lines, a stray '<' in a plot does not remove the following lines.
+_HTML_TAG_RE = re.compile(r'<[^>\n]*>')
 def remove_HTML_tags(s):
-    p = re.compile('<.*?>')
-    s = p.sub('', s)
-    return s
+    return _HTML_TAG_RE.sub('', s)
 
 def unescape_and_untag_HTML(s):
-    s = text_unescape_HTML(s)
-    s = text_remove_HTML_tags(s)
+    s = unescape_HTML(s)
+    s = remove_HTML_tags(s)
     return s
 
 # -------------------------------------------------------------------------------------------------
@@ -429,18 +386,16 @@ def unescape_and_untag_HTML(s):
 #
 # 1) Cleans ROM tags: [BIOS], (Europe), (Rev A), ...
 # 2) Substitutes some characters by spaces
+#
+# Tags are removed with precompiled regexes, [] first, then () and {}, so overlapping brackets
+# like 'a (b [c) d]' give 'a (b'. The characters are removed with one translate() pass and
+# repeated whitespace is collapsed.
+_ROM_TAGS_RE_LIST = [re.compile(r'\[.*?\]'), re.compile(r'\(.*?\)'), re.compile(r'\{.*?\}')]
+_ROM_SCRAPING_STRIP_TABLE = {ord(c) : None for c in '_-:.'}
 def format_ROM_name_for_scraping(title):
-    title = re.sub('\[.*?\]', '', title)
-    title = re.sub('\(.*?\)', '', title)
-    title = re.sub('\{.*?\}', '', title)
-
-    title = title.replace('_', '')
-    title = title.replace('-', '')
-    title = title.replace(':', '')
-    title = title.replace('.', '')
-    title = title.strip()
-
-    return title
+    for tags_re in _ROM_TAGS_RE_LIST:
+        title = tags_re.sub('', title)
+    return ' '.join(const.text_type(title).translate(_ROM_SCRAPING_STRIP_TABLE).split())
 
 # Format ROM file name when scraping is disabled.
 # 1) Remove No-Intro/TOSEC tags (), [], {} at the end of the file
@@ -449,13 +404,13 @@ def format_ROM_name_for_scraping(title):
 # clean_tags -> bool
 #
 # Returns a Unicode string.
+_ROM_TITLE_TOKENS_RE = re.compile(r'\[.+?\]\s?|\(.+?\)\s?|\{.+?\}|[^\[\(\{]+')
 def format_ROM_title(title, clean_tags):
     #
     # Regexp to decompose a string in tokens
     #
     if clean_tags:
-        reg_exp = '\[.+?\]\s?|\(.+?\)\s?|\{.+?\}|[^\[\(\{]+'
-        tokens = re.findall(reg_exp, title)
+        tokens = _ROM_TITLE_TOKENS_RE.findall(title)
         str_list = []
         for token in tokens:
             stripped_token = token.strip()
@@ -481,48 +436,41 @@ def format_ROM_title(title, clean_tags):
 # -------------------------------------------------------------------------------------------------
 # URLs
 # -------------------------------------------------------------------------------------------------
+# Returns the extension of the URL path with no dot, '' if the path has no extension.
+# The query and fragment are ignored. urlsplit() is cheaper than urlparse() because it does
+# not look for ;parameters in the path, which image URLs do not use.
+if const.ADDON_RUNNING_PYTHON_2:
+    _urlsplit = urlparse.urlsplit
+elif const.ADDON_RUNNING_PYTHON_3:
+    _urlsplit = urllib.parse.urlsplit
+else:
+    raise TypeError('Undefined Python runtime version.')
+
+def _get_URL_path_extension(url):
+    return os.path.splitext(_urlsplit(url).path)[1][1:]
+
 # Get extension of URL. Returns '' if not found. Examples: 'png', 'jpg', 'gif'.
 def get_URL_extension(url):
-    if const.ADDON_RUNNING_PYTHON_2:
-        path = urlparse.urlparse(url).path
-    elif const.ADDON_RUNNING_PYTHON_3:
-        path = urllib.parse.urlparse(url).path
-    else:
-        raise TypeError('Undefined Python runtime version.')
-    ext = os.path.splitext(path)[1]
-    if ext[0] == '.': ext = ext[1:] # Remove initial dot
-    return ext
+    return _get_URL_path_extension(url)
 
 # Defaults to 'jpg' if URL extension cannot be determined
 def get_image_URL_extension(url):
-    if const.ADDON_RUNNING_PYTHON_2:
-        path = urlparse.urlparse(url).path
-    elif const.ADDON_RUNNING_PYTHON_3:
-        path = urllib.parse.urlparse(url).path
-    else:
-        raise TypeError('Undefined Python runtime version.')
-    ext = os.path.splitext(path)[1]
-    if ext[0] == '.': ext = ext[1:] # Remove initial dot
-    ret = 'jpg' if ext == '' else ext
-    return ret
+    return _get_URL_path_extension(url) or 'jpg'
 
 # -------------------------------------------------------------------------------------------------
 # Misc stuff
 #
 # TODO Filesystem IO functions must be moved to utils.py
 # -------------------------------------------------------------------------------------------------
-# Generates a random an unique MD5 hash and returns a string with the hash
+# Generates a random and unique 128 bit ID and returns it as a 32 character hex string, the
+# same format as the old MD5 based IDs. The bytes come from the OS random number generator.
 def generate_random_SID():
-    t1 = time.time()
-    t2 = t1 + random.getrandbits(32)
     if const.ADDON_RUNNING_PYTHON_2:
-        base = hashlib.md5(text_type(t1 + t2))
+        return os.urandom(16).encode('hex')
     elif const.ADDON_RUNNING_PYTHON_3:
-        base = hashlib.md5(const.text_type(t1 + t2).encode('utf-8'))
+        return secrets.token_hex(16)
     else:
         raise TypeError('Undefined Python runtime version.')
-    sid = base.hexdigest()
-    return sid
 
 # See https://docs.python.org/3.8/library/time.html#time.gmtime
 def time_to_str(secs):
@@ -582,7 +530,7 @@ def look_for_Redump_DAT(platform, DAT_list):
 # Default return value in Python is None.
 # Usage example:
 #  f = open()
-#  for chunk in misc_read_file_in_chunks(f):
+#  for chunk in read_file_in_chunks(f):
 #     do_something()
 def read_file_in_chunks(file_object, chunk_size = 8192):
     while True:
@@ -590,28 +538,53 @@ def read_file_in_chunks(file_object, chunk_size = 8192):
         if not data: break
         yield data
 
+# Default chunk size when computing file checksums. ROMs are usually several MB so big chunks
+# reduce the number of Python calls to the CRC and hash functions. Use 4 MB for SSDs.
+CHECKSUM_CHUNK_SIZE = 1024 * 1024
+
+# Files up to this size are memory mapped and every checksum is computed with a single call.
+# Bigger files are read in chunks.
+CHECKSUM_MMAP_MAX_SIZE = 512 * 1024 * 1024
+
 # Calculates CRC, MD5 and SHA1 of a file in an efficient way.
 # Returns a dictionary with the checksums or None in case of error.
 #
 # https://stackoverflow.com/questions/519633/lazy-method-for-reading-big-file-in-python
 # https://stackoverflow.com/questions/1742866/compute-crc-of-file-in-python
-def calculate_file_checksums(full_file_path):
+def calculate_file_checksums(full_file_path, chunk_size = CHECKSUM_CHUNK_SIZE):
     log.debug('Computing checksums "{}"'.format(full_file_path))
     try:
-        f = open(full_file_path, 'rb')
-        crc_prev = 0
-        md5 = hashlib.md5()
-        sha1 = hashlib.sha1()
-        for piece in misc_read_file_in_chunks(f):
-            crc_prev = zlib.crc32(piece, crc_prev)
-            md5.update(piece)
-            sha1.update(piece)
+        size = os.path.getsize(full_file_path)
+        with open(full_file_path, 'rb') as f:
+            crc_prev = 0
+            md5 = hashlib.md5()
+            sha1 = hashlib.sha1()
+            # Empty files cannot be memory mapped (fails on Windows).
+            # mmap() can fail for big files on 32-bit platforms (ENOMEM/EINVAL), in that case
+            # the file is read in chunks. mmap.error is OSError in Python 3.
+            mm = None
+            if 0 < size <= CHECKSUM_MMAP_MAX_SIZE:
+                try:
+                    mm = mmap.mmap(f.fileno(), 0, access = mmap.ACCESS_READ)
+                except (mmap.error, ValueError):
+                    log.debug('calculate_file_checksums() mmap() failed, reading in chunks')
+            if mm is not None:
+                try:
+                    crc_prev = zlib.crc32(mm)
+                    md5.update(mm)
+                    sha1.update(mm)
+                finally:
+                    mm.close()
+            else:
+                for piece in read_file_in_chunks(f, chunk_size):
+                    crc_prev = zlib.crc32(piece, crc_prev)
+                    md5.update(piece)
+                    sha1.update(piece)
         crc_digest = '{:08X}'.format(crc_prev & 0xFFFFFFFF)
         md5_digest = md5.hexdigest()
         sha1_digest = sha1.hexdigest()
-        size = os.path.getsize(full_file_path)
     except:
-        log.debug('(Exception) In misc_calculate_file_checksums()')
+        log.debug('(Exception) In calculate_file_checksums()')
         log.debug('Returning None')
         return None
     checksums = {
@@ -623,6 +596,17 @@ def calculate_file_checksums(full_file_path):
 
     return checksums
 
+# Returns the MD5 of a file as a lowercase hex string.
+# hashlib.file_digest() (Python 3.11 and up) reads and hashes the file in C.
+def calculate_file_MD5(full_file_path):
+    with open(full_file_path, 'rb') as f:
+        if hasattr(hashlib, 'file_digest'):
+            return hashlib.file_digest(f, 'md5').hexdigest()
+        md5 = hashlib.md5()
+        for piece in read_file_in_chunks(f, 1024 * 1024):
+            md5.update(piece)
+    return md5.hexdigest()
+
 # This function not finished yet.
 def read_bytes_in_chunks(file_bytes, chunk_size = 8192):
     file_length = len(file_bytes)
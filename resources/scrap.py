@@ -28,6 +28,7 @@ import resources.assets as assets
 import resources.db as db
 import resources.network as network
 import resources.audit as audit
+import resources.fastjson as fastjson
 
 # --- Python standard library ---
 import abc
@@ -40,6 +41,7 @@ import json
 import os
 import re
 import socket
+import threading
 import time
 import zipfile
 if const.ADDON_RUNNING_PYTHON_2:
@@ -171,8 +173,8 @@ class FilterROM(object):
 
     def _load_JSON(self, file_path):
         log.debug('FilterROM::_load_JSON() Loading "{}"'.format(file_path))
-        with io.open(file_path, 'rt', encoding = 'utf-8') as file:
-            data = json.load(file)
+        with io.open(file_path, 'rb') as file:
+            data = fastjson.loads(file.read())
         return data
 
     # Returns True if ROM is filtered, False otherwise.
@@ -1496,9 +1498,6 @@ class Scraper(object):
         GLOBAL_CACHE_TGDB_GENRES, GLOBAL_CACHE_TGDB_DEVELOPERS,
     ]
 
-    JSON_indent = 1
-    JSON_separators = (',', ':')
-
     # --- Constructor ----------------------------------------------------------------------------
     # @param settings: [dict] Addon settings.
     def __init__(self, settings):
@@ -1551,7 +1550,8 @@ class Scraper(object):
         log.debug('Scraper.set_debug_file_dump() dump_file_flag {}'.format(dump_file_flag))
         log.debug('Scraper.set_debug_file_dump() dump_dir {}'.format(dump_dir))
         self.dump_file_flag = dump_file_flag
-        self.dump_dir = dump_dir
+        # Resolve the directory once. Debug files are dumped many times when scraping.
+        self.dump_dir = os.path.abspath(dump_dir) if dump_dir else dump_dir
 
     # ScreenScraper needs the checksum of the file scraped. This function sets the checksums
     # externally for debugging purposes, for example when debugging the scraper with
@@ -1568,17 +1568,28 @@ class Scraper(object):
     # This function is used internally by the scrapers if the flag self.dump_file_flag is True.
     def _dump_json_debug(self, file_name, data_dic):
         if not self.dump_file_flag: return
-        file_path = os.path.join(self.dump_dir, file_name)
         if const.SCRAPER_CACHE_HUMAN_JSON:
             json_str = json.dumps(data_dic, indent = 4, separators = (', ', ' : '))
         else:
-            json_str = json.dumps(data_dic)
-        self._write_str_to_file(file_path, json_str)
+            json_str = fastjson.dumps(data_dic)
+        self._write_debug_file(file_name, json_str)
 
     def _dump_file_debug(self, file_name, page_data):
         if not self.dump_file_flag: return
-        file_path = os.path.join(self.dump_dir, file_name)
-        self._write_str_to_file(file_path, page_data)
+        self._write_debug_file(file_name, page_data)
+
+    # Debug files are written with low level os functions, no Python file object is created.
+    # Data is encoded to UTF-8 and written with UNIX end of lines (binary mode on Windows).
+    def _write_debug_file(self, file_name, data_str):
+        data = data_str.encode('utf-8') if isinstance(data_str, const.text_type) else data_str
+        flags = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, 'O_BINARY', 0)
+        fd = os.open(os.path.join(self.dump_dir, file_name), flags, 0o644)
+        try:
+            data_view = memoryview(data)
+            while data_view:
+                data_view = data_view[os.write(fd, data_view):]
+        finally:
+            os.close(fd)
 
     @abc.abstractmethod
     def get_name(self): pass
@@ -2003,14 +2014,14 @@ class Scraper(object):
 
     def _load_JSON(self, filename):
         # log.debug('Scraper::_load_JSON() Loading "{}"'.format(filename))
-        with io.open(filename, 'rt', encoding = 'utf-8') as file:
-            data = json.load(file)
+        with io.open(filename, 'rb') as file:
+            data = fastjson.loads(file.read())
         return data
 
     def _write_JSON(self, filename, data):
         # log.debug('Scraper::_write_JSON() Loading "{}"'.format(filename))
-        with io.open(filename, 'wt', encoding = 'utf-8', newline = '\n') as file:
-            file.write(json.dumps(data, ensure_ascii = False, sort_keys = True,
+        with io.open(filename, 'wb') as file:
+            file.write(fastjson.dumps_sorted_bytes(data,
                 indent = Scraper.JSON_indent, separators = Scraper.JSON_separators))
 
 # ------------------------------------------------------------------------------------------------
@@ -2325,11 +2336,19 @@ class TheGamesDB(Scraper):
     URL_Publishers = 'https://api.thegamesdb.net/v1/Publishers'
     URL_Images     = 'https://api.thegamesdb.net/v1/Games/Images'
 
+    # The list of TGDB platforms does not change during the lifetime of the process.
+    # It is shared by all TheGamesDB objects.
+    platforms_json_cache = None
+    platforms_json_lock = threading.Lock()
+
     # --- Constructor ----------------------------------------------------------------------------
     def __init__(self, settings):
         # --- This scraper settings ---
         # Make sure this is the public key (limited by IP) and not the private key.
         self.api_public_key = '828be1fb8f3182d055f1aed1f7d4da8bd4ebc160c3260eae8ee57ea823b42415'
+        # In-memory cache of get_candidates() results. FileName objects are not hashable so
+        # the key is (search_term, ROM basename, platform).
+        self.candidates_mem_cache = {}
 
         # --- Pass down common scraper settings ---
         super(TheGamesDB, self).__init__(settings)
@@ -2364,6 +2383,12 @@ class TheGamesDB(Scraper):
             log.debug('TheGamesDB.get_candidates() Scraper disabled. Returning empty data.')
             return None
 
+        # Repeated searches in the same session do not hit the network again.
+        mem_cache_key = (search_term, rom_FN.getBase(), platform)
+        if mem_cache_key in self.candidates_mem_cache:
+            log.debug('TheGamesDB.get_candidates() Memory cache hit "{}"'.format(rom_FN.getBase()))
+            return copy.deepcopy(self.candidates_mem_cache[mem_cache_key])
+
         # Prepare data for scraping.
         rombase_noext = rom_FN.getBaseNoExt()
 
@@ -2375,6 +2400,8 @@ class TheGamesDB(Scraper):
         log.debug('TheGamesDB.get_candidates() TheGamesDB platform "{}"'.format(scraper_platform))
         candidate_list = self._search_candidates(search_term, platform, scraper_platform, st_dic)
         if kodi.is_error_status(st_dic): return None
+        # Callers may modify the list, the cache keeps its own copy.
+        self.candidates_mem_cache[mem_cache_key] = copy.deepcopy(candidate_list)
 
         # --- Deactivate this for now ---
         # if len(candidate_list) == 0:
@@ -2478,15 +2505,20 @@ class TheGamesDB(Scraper):
         return url, url_log
 
     def resolve_asset_URL_extension(self, selected_asset, image_url, st):
-        return text_get_URL_extension(image_url)
+        return misc.get_URL_extension(image_url)
 
     # --- This class own methods -----------------------------------------------------------------
     def debug_get_platforms(self, st):
         log.debug('TheGamesDB.debug_get_platforms() BEGIN...')
-        url = TheGamesDB.URL_Platforms + '?apikey={}'.format(self._get_API_key())
-        json_data = self._retrieve_URL_as_JSON(url, st)
-        if kodi.is_error_status(st): return None
-        self._dump_json_debug('TGDB_get_platforms.json', json_data)
+        with TheGamesDB.platforms_json_lock:
+            if TheGamesDB.platforms_json_cache is not None:
+                log.debug('TheGamesDB.debug_get_platforms() Memory cache hit')
+                return copy.deepcopy(TheGamesDB.platforms_json_cache)
+            url = TheGamesDB.URL_Platforms + '?apikey={}'.format(self._get_API_key())
+            json_data = self._retrieve_URL_as_JSON(url, st)
+            if kodi.is_error_status(st): return None
+            self._dump_json_debug('TGDB_get_platforms.json', json_data)
+            TheGamesDB.platforms_json_cache = copy.deepcopy(json_data)
         return json_data
 
     def debug_get_genres(self, st_dic):
@@ -2705,7 +2737,7 @@ class TheGamesDB(Scraper):
             log.debug('TheGamesDB. No cached publishers. Retrieving from online.')
             url = TheGamesDB.URL_Publishers + '?apikey={}'.format(self._get_API_key())
             page_data_raw = network.get_URL(url, self._clean_URL_for_log(url))
-            publishers_json = json.loads(page_data_raw)
+            publishers_json = fastjson.loads(page_data_raw)
             self.publishers = {}
             for publisher_id in publishers_json['data']['publishers']:
                 self.publishers[int(publisher_id)] = publishers_json['data']['publishers'][publisher_id]['name']
@@ -2799,7 +2831,7 @@ class TheGamesDB(Scraper):
         # --- Check HTTP error codes ---
         if http_code != 200:
             try:
-                json_data = json.loads(page_data_raw)
+                json_data = fastjson.loads(page_data_raw)
                 error_msg = json_data['message']
             except:
                 error_msg = 'Unknown/unspecified error.'
@@ -2815,7 +2847,7 @@ class TheGamesDB(Scraper):
 
         # Convert data to JSON.
         try:
-            json_data = json.loads(page_data_raw)
+            json_data = fastjson.loads(page_data_raw)
         except Exception as ex:
             self._handle_exception(ex, st_dic, 'Error decoding JSON data from TGDB.')
             return None
@@ -3020,7 +3052,7 @@ class MobyGames(Scraper):
         return url, url_log
 
     def resolve_asset_URL_extension(self, selected_asset, image_url, st_dic):
-        return text_get_URL_extension(image_url)
+        return misc.get_URL_extension(image_url)
 
     # --- This class own methods -----------------------------------------------------------------
     def debug_get_platforms(self, st_dic):
@@ -3232,7 +3264,7 @@ class MobyGames(Scraper):
             # HTTP status code it also has valid JSON.
             try:
                 # log_variable('page_data_raw', page_data_raw)
-                json_data = json.loads(page_data_raw)
+                json_data = fastjson.loads(page_data_raw)
                 error_msg = json_data['message']
             except:
                 error_msg = 'Unknown/unspecified error.'
@@ -3248,7 +3280,7 @@ class MobyGames(Scraper):
 
         # Convert data to JSON.
         try:
-            json_data = json.loads(page_data_raw)
+            json_data = fastjson.loads(page_data_raw)
         except Exception as ex:
             self._handle_exception(ex, st_dic, 'Error decoding JSON data from MobyGames.')
             return None
@@ -4084,7 +4116,7 @@ class ScreenScraper(Scraper):
                 log.debug('_get_SS_checksum() Decompressing file "{}"'.format(namelist[0]))
                 file_bytes = zip.read(namelist[0])
                 log.debug('_get_SS_checksum() Decompressed size is {} bytes'.format(len(file_bytes)))
-                checksums = misc_calculate_stream_checksums(file_bytes)
+                checksums = misc.calculate_stream_checksums(file_bytes)
                 checksums['rom_name'] = namelist[0]
                 log.debug('_get_SS_checksum() ROM name is "{}"'.format(checksums['rom_name']))
                 return checksums
@@ -4094,7 +4126,7 @@ class ScreenScraper(Scraper):
         else:
             log.debug('_get_SS_checksum() File is not ZIP. Computing checksum of whole file.')
         # Otherwise calculate checksums of the whole file
-        checksums = misc_calculate_file_checksums(f_path)
+        checksums = misc.calculate_file_checksums(f_path)
         checksums['rom_name'] = f_basename
         log.debug('_get_SS_checksum() ROM name is "{}"'.format(checksums['rom_name']))
 
@@ -4231,7 +4263,7 @@ class ScreenScraper(Scraper):
 
         # Convert data to JSON.
         try:
-            return json.loads(page_data_raw)
+            return fastjson.loads(page_data_raw)
         except Exception as ex:
             log.error('Error decoding JSON data from ScreenScraper.')
 
@@ -4246,7 +4278,7 @@ class ScreenScraper(Scraper):
         log.error('Trying to repair ScreenScraper raw data (Try 1).')
         new_page_data_raw = page_data_raw.replace('],\n\t\t}', ']\n\t\t}')
         try:
-            return json.loads(new_page_data_raw)
+            return fastjson.loads(new_page_data_raw)
         except Exception as ex:
             log.error('Error decoding JSON data from ScreenScraper (Try 1).')
 
@@ -4258,7 +4290,7 @@ class ScreenScraper(Scraper):
         log.error('Trying to repair ScreenScraper raw data (Try 2).')
         new_page_data_raw = page_data_raw.replace('\t\t},\n\t\t}', '\t\t}\n\t\t}')
         try:
-            return json.loads(new_page_data_raw)
+            return fastjson.loads(new_page_data_raw)
         except Exception as ex:
             log.error('Error decoding JSON data from ScreenScraper (Try 2).')
             log.error('Cannot decode JSON (invalid JSON returned). Dumping debug files...')
@@ -4920,7 +4952,7 @@ class ArcadeDB(Scraper):
         # --- Check HTTP error codes ---
         if http_code != 200:
             try:
-                json_data = json.loads(page_data_raw)
+                json_data = fastjson.loads(page_data_raw)
                 error_msg = json_data['message']
             except:
                 error_msg = 'Unknown/unspecified error.'
@@ -4936,7 +4968,7 @@ class ArcadeDB(Scraper):
 
         # Convert data to JSON.
         try:
-            json_data = json.loads(page_data_raw)
+            json_data = fastjson.loads(page_data_raw)
         except Exception as ex:
             self._handle_exception(ex, st_dic, 'Error decoding JSON data from ArcadeDB.')
             return None
@@ -24,13 +24,14 @@
 # to use addon modules with CPython for testing or debugging.
 #
 # This module must NOT include any other addon modules to avoid circular dependencies. The
-# only exception to this rule is the module .const. This module is virtually included
-# by every other addon module.
+# only exceptions to this rule are the modules .const, .log and .fastjson, which only depend
+# on the Python standard library. .const is virtually included by every other addon module.
 #
 # How to report errors on the low-level filesystem functions??? See the end of the file.
 
 # --- Addon modules ---
 import resources.const as const
+import resources.fastjson as fastjson
 import resources.log as log
 
 # --- Kodi modules ---
@@ -60,8 +61,43 @@ import string
 import sys
 import threading
 import time
-import xml.etree.ElementTree
 import zlib
+# In Python 2 the C implementation of ElementTree is cElementTree and it is much faster than
+# the pure Python one. In Python 3 ElementTree uses the C accelerator automatically and
+# cElementTree was removed in Python 3.9.
+try:
+    import xml.etree.cElementTree as ET
+except ImportError:
+    import xml.etree.ElementTree as ET
+
+# Extension sets used by FileName.isImageFile(), isManual() and isVideoFile().
+_IMAGE_EXTENSION_SET = frozenset(const.IMAGE_EXTENSION_LIST)
+_MANUAL_EXTENSION_SET = frozenset(const.MANUAL_EXTENSION_LIST)
+_TRAILER_EXTENSION_SET = frozenset(const.TRAILER_EXTENSION_LIST)
+
+# Returns the match function of a glob mask used by the FileName scanners. The addon only
+# uses a handful of masks ('*.*', '*.dat', '*.nfo') so match functions are cached forever.
+# Like fnmatch.filter(), the mask is normalised with os.path.normcase() so names must be
+# normalised too.
+#
+# The masks used by the addon do not need a regex: '*.*' matches names with a dot and
+# '*.ext' is a suffix test. Any other mask is translated with fnmatch.translate().
+_mask_match_cache = {}
+def _get_mask_match(mask):
+    try:
+        return _mask_match_cache[mask]
+    except KeyError:
+        pass
+    norm_mask = os.path.normcase(mask)
+    suffix = norm_mask[1:]
+    if norm_mask == '*.*':
+        mask_match = lambda name: '.' in name
+    elif norm_mask.startswith('*.') and not any(c in suffix for c in '*?['):
+        mask_match = lambda name: name.endswith(suffix)
+    else:
+        mask_match = re.compile(fnmatch.translate(norm_mask)).match
+    _mask_match_cache[mask] = mask_match
+    return mask_match
 
 # -------------------------------------------------------------------------------------------------
 # Filesystem helper class.
@@ -83,38 +119,68 @@ import zlib
 #   FileName.getBaseNoExt()     File name with no path and no extension       Sonic
 #   FileName.getExt()           File extension                                .zip
 # -------------------------------------------------------------------------------------------------
-class FileName:
+#
+# Thousands of FileName objects are created when scanning ROMs so instances have no __dict__.
+# __slots__ only works in new style classes in Python 2, hence the object base class.
+class FileName(object):
+    __slots__ = ('originalPath', '_path', '_needs_translate', '_path_splitext')
+
     # pathString must be a Unicode string object
     def __init__(self, pathString):
         self.originalPath = pathString
-        self.path = pathString
+        self._path = pathString
+        self._needs_translate = False
+        self._path_splitext = None
 
         # --- Path transformation ---
-        if self.originalPath.lower().startswith('smb:'):
-            self.path = self.path.replace('smb:', '')
-            self.path = self.path.replace('SMB:', '')
-            self.path = self.path.replace('//', '\\\\')
-            self.path = self.path.replace('/', '\\')
-
-        elif self.originalPath.lower().startswith('special:'):
-            self.path = xbmcvfs.translatePath(self.path)
-
+        # Only the prefix is lowercased, not the whole path.
+        # smb://server/dir/ -> \\server\dir\ with a single slice and replace.
+        # special:// paths are translated the first time self.path is used, see below.
+        path_prefix = pathString[:8].lower()
+        if path_prefix.startswith('smb:'):
+            self._path = self._path[4:].replace('/', '\\')
+
+        elif path_prefix == 'special:':
+            self._needs_translate = True
+
+    # xbmcvfs.translatePath() is called lazily. Many special:// FileName objects are only
+    # used to build other paths with pjoin() or to get the original path.
+    @property
+    def path(self):
+        if self._needs_translate:
+            self._path = xbmcvfs.translatePath(self._path)
+            self._needs_translate = False
+        return self._path
+
+    @path.setter
+    def path(self, value):
+        self._path = value
+        self._needs_translate = False
+
+    # _join_raw() and pappend() work on the raw path and keep _needs_translate. A special://
+    # path is translated once, with the joined parts, when self.path is read.
     def _join_raw(self, arg):
-        self.path = os.path.join(self.path, arg)
+        self._path = os.path.join(self._path, arg)
         self.originalPath = os.path.join(self.originalPath, arg)
+        self._path_splitext = None
         return self
 
     # Appends a string to path. Returns self FileName object
     # Instead of append() use pappend(). This will avoid using string.append() instead of FileName.append()
     def pappend(self, arg):
-        self.path = self.path + arg
+        self._path = self._path + arg
         self.originalPath = self.originalPath + arg
+        self._path_splitext = None
         return self
 
     # Behaves like os.path.join(). Returns a FileName object
     # Instead of join() use pjoin(). This will avoid using string.join() instead of FileName.join()
     def pjoin(self, *args):
         child = FileName(self.originalPath)
+        # Reuse the parent path. If the parent path is already translated the child path
+        # is not translated at all.
+        child._path = self._path
+        child._needs_translate = self._needs_translate
         for arg in args:
             child._join_raw(arg)
         return child
@@ -137,6 +203,7 @@ class FileName:
     def escapeQuotes(self):
         self.path = self.path.replace("'", "\\'")
         self.path = self.path.replace('"', '\\"')
+        self._path_splitext = None
 
     # ---------------------------------------------------------------------------------------------
     # Filename decomposition.
@@ -147,9 +214,17 @@ class FileName:
     def getPath(self):
         return self.path
 
+    # os.path.splitext(self.path) is computed once, scanners call several getters for every
+    # file. The cache is the tuple (root, ext, lowercase ext with no dot).
+    # Methods that change self.path must reset the cache to None.
+    def _splitext(self):
+        if self._path_splitext is None:
+            root, ext = os.path.splitext(self.path)
+            self._path_splitext = (root, ext, ext[1:].lower())
+        return self._path_splitext
+
     def getPathNoExt(self):
-        root, ext = os.path.splitext(self.path)
-        return root
+        return self._splitext()[0]
 
     def getDir(self):
         return os.path.dirname(self.path)
@@ -158,56 +233,75 @@ class FileName:
         return os.path.basename(self.path)
 
     def getBaseNoExt(self):
-        basename  = os.path.basename(self.path)
-        root, ext = os.path.splitext(basename)
-        return root
+        return os.path.basename(self._splitext()[0])
 
     def getExt(self):
-        root, ext = os.path.splitext(self.path)
-        return ext
+        return self._splitext()[1]
 
+    # Returns a new FileName object with the extension replaced. Only the extension is changed,
+    # a directory like /roms/game.zip/ in the path is left untouched.
     def changeExtension(self, targetExt):
-        raise AddonException('Implement me.')
-        ext = self.getExt()
-        copiedPath = self.originalPath
         if not targetExt.startswith('.'):
-            targetExt = '.{0}'.format(targetExt)
-        new_path = self.__create__(copiedPath.replace(ext, targetExt))
-        return new_path
+            targetExt = '.{}'.format(targetExt)
+        root, ext = os.path.splitext(self.originalPath)
+        return FileName(root + targetExt)
 
     # Checks the extension to determine the type of the file.
+    # The cached lowercase extension with no dot is shared by the three checks.
     def isImageFile(self):
-        return '.' + self.getExt().lower() in const.IMAGE_EXTENSION_LIST
+        return self._splitext()[2] in _IMAGE_EXTENSION_SET
 
     def isManual(self):
-        return '.' + self.getExt().lower() in const.MANUAL_EXTENSION_LIST
+        return self._splitext()[2] in _MANUAL_EXTENSION_SET
 
     def isVideoFile(self):
-        return '.' + self.getExt().lower() in const.TRAILER_EXTENSION_LIST
+        return self._splitext()[2] in _TRAILER_EXTENSION_SET
 
     # ---------------------------------------------------------------------------------------------
     # Scanner functions
     # ---------------------------------------------------------------------------------------------
+    # Like fnmatch.filter() names are compared with os.path.normcase() so matching is case
+    # insensitive on Windows.
+    # Directories that match mask are returned too, like fnmatch.filter() on os.listdir() did.
     def scanFilesInPath(self, mask):
-        files = []
-        filenames = os.listdir(self.path)
-        for filename in fnmatch.filter(filenames, mask):
-            files.append(os.path.join(self.path, filename))
-        return files
+        mask_match = _get_mask_match(mask)
+        normcase = os.path.normcase
+        return [os.path.join(self.path, f) for f in os.listdir(self.path) if mask_match(normcase(f))]
 
     def scanFilesInPathAsPaths(self, mask):
-        files = []
-        filenames = os.listdir(self.path)
-        for filename in fnmatch.filter(filenames, mask):
-            files.append(FileName(os.path.join(self.path, filename)))
-        return files
+        return [FileName(file_path) for file_path in self.scanFilesInPath(mask)]
 
     def recursiveScanFilesInPath(self, mask):
-        files = []
-        for root, dirs, foundfiles in os.walk(self.path):
-            for filename in fnmatch.filter(foundfiles, mask):
-                files.append(os.path.join(root, filename))
-        return files
+        return list(self.iterRecursiveScanFilesInPath(mask))
+
+    # Generator version of recursiveScanFilesInPath(). Files are yielded in the same order as
+    # os.walk(): files of a directory first, then its subdirectories, in directory order.
+    # Symbolic links to directories are not followed and, like in os.walk(), are not
+    # reported as files. Directories that cannot be read are skipped.
+    #
+    # In Python 3 os.scandir() returns the entry type together with the name so no stat()
+    # is needed for most entries and the mask is tested before any path string is built.
+    def iterRecursiveScanFilesInPath(self, mask):
+        mask_match = _get_mask_match(mask)
+        normcase = os.path.normcase
+        if const.ADDON_RUNNING_PYTHON_2:
+            for root, dirs, foundfiles in os.walk(self.path):
+                for f in foundfiles:
+                    if mask_match(normcase(f)): yield os.path.join(root, f)
+            return
+        dir_stack = [self.path]
+        while dir_stack:
+            subdir_list = []
+            try:
+                with os.scandir(dir_stack.pop()) as dir_iterator:
+                    for entry in dir_iterator:
+                        if entry.is_dir():
+                            if not entry.is_symlink(): subdir_list.append(entry.path)
+                        elif mask_match(normcase(entry.name)):
+                            yield entry.path
+            except OSError:
+                continue
+            dir_stack.extend(reversed(subdir_list))
 
     # ---------------------------------------------------------------------------------------------
     # Filesystem functions
@@ -260,31 +354,45 @@ class FileName:
 # -------------------------------------------------------------------------------------------------
 # Low level filesystem functions.
 # -------------------------------------------------------------------------------------------------
+# The filesystem encoding does not change while the addon runs.
+_FS_ENCODING = sys.getfilesystemencoding()
+
 def get_fs_encoding():
-    fs_encoding = sys.getfilesystemencoding()
-    return fs_encoding
+    return _FS_ENCODING
 
+# shutil.copyfile() only copies the data, shutil.copy() also copies the permission bits.
+# In Python 3.8 and later copyfile() uses os.sendfile() on Linux.
+# FileName paths are already Unicode, only byte strings are decoded in Python 2.
 def copy_file(source_str, dest_str):
     if const.ADDON_RUNNING_PYTHON_2:
-        source_bytes = source_str.decode(utils_get_fs_encoding(), 'ignore')
-        dest_bytes = dest_str.decode(utils_get_fs_encoding(), 'ignore')
-        shutil.copy(source_bytes, dest_bytes)
+        if not isinstance(source_str, const.text_type):
+            source_str = source_str.decode(_FS_ENCODING, 'ignore')
+        if not isinstance(dest_str, const.text_type):
+            dest_str = dest_str.decode(_FS_ENCODING, 'ignore')
+        shutil.copyfile(source_str, dest_str)
     elif const.ADDON_RUNNING_PYTHON_3:
-        shutil.copy(source_str, dest_str)
+        shutil.copyfile(source_str, dest_str)
     else:
         raise TypeError('Undefined Python runtime version.')
 
+# Buffer size of the text file writers. Reports and XML exports can be several MB, the
+# TextIOWrapper encodes the string to UTF-8 and writes it to disk in blocks of this size
+# instead of the default 8 KB.
+WRITE_BUFFER_SIZE = 1024 * 1024
+
 # Always write UNIX end of lines regarding of the operating system.
 def write_str_to_file(filename, full_string):
     log.debug('write_str_to_file() File "{}"'.format(filename))
-    with io.open(filename, 'wt', encoding = 'utf-8', newline = '\n') as f:
+    with io.open(filename, 'wt', encoding = 'utf-8', newline = '\n',
+        buffering = WRITE_BUFFER_SIZE) as f:
         f.write(full_string)
 
+# Universal newlines, '\r\n' is read as '\n'.
+# Called for every NFO file when scanning, do not log here.
 def load_file_to_str(filename):
-    log.debug('load_file_to_str() File "{}"'.format(filename))
     with io.open(filename, 'rt', encoding = 'utf-8') as f:
-        string = f.read()
-    return string
+        file_str = f.read()
+    return file_str
 
 # -------------------------------------------------------------------------------------------------
 # Generic text file writer.
@@ -294,17 +402,16 @@ def load_file_to_str(filename):
 def write_slist_to_file(filename, slist):
     log.debug('write_slist_to_file() File "{}"'.format(filename))
     try:
-        file_obj = io.open(filename, 'wt', encoding = 'utf-8')
-        file_obj.write('\n'.join(slist))
-        file_obj.close()
+        with io.open(filename, 'wt', encoding = 'utf-8', buffering = WRITE_BUFFER_SIZE) as file_obj:
+            file_obj.write('\n'.join(slist))
     except OSError:
-        log.error('(OSError) exception in utils_write_slist_to_file()')
+        log.error('(OSError) exception in write_slist_to_file()')
         log.error('Cannot write {} file'.format(filename))
-        raise AEL_Error('(OSError) Cannot write {} file'.format(filename))
+        raise KodiAddonError('(OSError) Cannot write {} file'.format(filename))
     except IOError:
-        log.error('(IOError) exception in utils_write_slist_to_file()')
+        log.error('(IOError) exception in write_slist_to_file()')
         log.error('Cannot write {} file'.format(filename))
-        raise AEL_Error('(IOError) Cannot write {} file'.format(filename))
+        raise KodiAddonError('(IOError) Cannot write {} file'.format(filename))
 
 def load_file_to_slist(filename):
     log.debug('load_file_to_slist() File "{}"'.format(filename))
@@ -314,12 +421,12 @@ def load_file_to_slist(filename):
 
 # If there are issues in the XML file (for example, invalid XML chars) ET.parse will fail.
 # Returns None if error.
-# Returns xml_tree = xml.etree.ElementTree.parse() if success.
+# Returns xml_tree = ET.parse() if success.
 def load_XML_to_ET(filename):
     log.debug('load_XML_to_ET() Loading {}'.format(filename))
     xml_tree = None
     try:
-        xml_tree = xml.etree.ElementTree.parse(filename)
+        xml_tree = ET.parse(filename)
     except IOError as ex:
         log.debug('load_XML_to_ET() (IOError) errno = {}'.format(ex.errno))
         # log.debug(text_type(ex.errno.errorcode))
@@ -328,11 +435,29 @@ def load_XML_to_ET(filename):
             log.error('load_XML_to_ET() (IOError) ENOENT No such file or directory.')
         else:
             log.error('load_XML_to_ET() (IOError) Unhandled errno value.')
-    except xml.etree.ElementTree.ParseError as ex:
+    except ET.ParseError as ex:
         log.error('load_XML_to_ET() (ParseError) Exception parsing {}'.format(filename))
         log.error('load_XML_to_ET() (ParseError) {}'.format(const.text_type(ex)))
     return xml_tree
 
+# Generator that yields the children of the XML root element as soon as they are parsed.
+# Every child is discarded after the caller processes it so memory usage does not depend
+# on the size of the file. Use this for big XML files instead of load_XML_to_ET().
+# IOError and ParseError exceptions are raised to the caller while iterating.
+def iterparse_XML_root_children(filename):
+    log.debug('iterparse_XML_root_children() Loading {}'.format(filename))
+    xml_root = None
+    depth = 0
+    for event, xml_element in ET.iterparse(filename, events = ('start', 'end')):
+        if event == 'start':
+            if xml_root is None: xml_root = xml_element
+            depth += 1
+        else:
+            depth -= 1
+            if depth == 1:
+                yield xml_element
+                xml_root.clear()
+
 # -------------------------------------------------------------------------------------------------
 # JSON write/load
 # -------------------------------------------------------------------------------------------------
@@ -344,12 +469,14 @@ def load_JSON_file(json_filename, default_obj = {}, verbose = True):
         log.warning('load_JSON_file() Not found "{}"'.format(json_filename))
         return json_data
     # Load and parse JSON file.
+    # The file is read as bytes. orjson and ujson decode UTF-8 themselves, much faster than
+    # the TextIOWrapper.
     if verbose: log.debug('load_JSON_file() "{}"'.format(json_filename))
-    with io.open(json_filename, 'rt', encoding = 'utf-8') as file:
+    with io.open(json_filename, 'rb') as file:
         try:
-            json_data = json.load(file)
+            json_data = fastjson.loads(file.read())
         except ValueError as ex:
-            log.error('load_JSON_file() ValueError exception in json.load() function')
+            log.error('load_JSON_file() ValueError exception in fastjson.loads() function')
     return json_data
 
 # This consumes a lot of memory but it is fast.
@@ -364,6 +491,7 @@ def write_JSON_file(json_filename, json_data, verbose = True, pprint = False):
 
     # Parameter pprint == True overrides option OPTION_COMPACT_JSON.
     # Choose JSON iterative encoder or normal encoder.
+    # The normal encoder produces UTF-8 bytes, compact JSON uses the fastest JSON library available.
     if const.OPTION_LOWMEM_WRITE_JSON:
         if verbose: log.debug('write_JSON_file() Using OPTION_LOWMEM_WRITE_JSON option')
         if pprint:
@@ -371,28 +499,28 @@ def write_JSON_file(json_filename, json_data, verbose = True, pprint = False):
                 indent = const.JSON_INDENT, separators = const.JSON_SEP)
         else:
             if const.OPTION_COMPACT_JSON:
-                jobj = json.JSONEncoder(ensure_ascii = False, sort_keys = True)
+                jobj = json.JSONEncoder(ensure_ascii = False, sort_keys = True,
+                    separators = const.JSON_SEP_COMPACT)
             else:
                 jobj = json.JSONEncoder(ensure_ascii = False, sort_keys = True,
                     indent = const.JSON_INDENT, separators = const.JSON_SEP)
     else:
-        if pprint:
-            jdata = json.dumps(json_data, ensure_ascii = False, sort_keys = True,
+        if pprint or not const.OPTION_COMPACT_JSON:
+            jdata = fastjson.dumps_sorted_bytes(json_data,
                 indent = const.JSON_INDENT, separators = const.JSON_SEP)
         else:
-            if const.OPTION_COMPACT_JSON:
-                jdata = json.dumps(json_data, ensure_ascii = False, sort_keys = True)
-            else:
-                jdata = json.dumps(json_data, ensure_ascii = False, sort_keys = True,
-                    indent = const.JSON_INDENT, separators = const.JSON_SEP)
+            jdata = fastjson.dumps_sorted_bytes(json_data)
 
     # Write JSON to disk
     try:
-        with io.open(json_filename, 'wt', encoding = 'utf-8') as file:
-            if const.OPTION_LOWMEM_WRITE_JSON:
+        if const.OPTION_LOWMEM_WRITE_JSON:
+            # iterencode() yields thousands of tiny chunks, buffer them before writing.
+            with io.open(json_filename, 'wt', encoding = 'utf-8',
+                buffering = WRITE_BUFFER_SIZE) as file:
                 for chunk in jobj.iterencode(json_data):
                     file.write(chunk)
-            else:
+        else:
+            with io.open(json_filename, 'wb') as file:
                 file.write(jdata)
     except OSError:
         kodi_notify(const.ADDON_LONG_NAME, 'Cannot write {} file (OSError)'.format(json_filename))
@@ -444,7 +572,7 @@ def file_cache_add_dir(dir_str, verbose = True):
     dir_FN = FileName(dir_str)
     if not dir_FN.exists():
         log.debug('file_cache_add_dir() Does not exist "{}"'.format(dir_str))
-        file_cache[dir_str] = set()
+        file_cache[dir_str] = {}
         return
     if not dir_FN.isdir():
         log.warning('file_cache_add_dir() Not a directory "{}"'.format(dir_str))
@@ -458,7 +586,7 @@ def file_cache_add_dir(dir_str, verbose = True):
     root_dir_str = dir_FN.getPath()
     # For Unicode errors in os.walk() see
     # https://stackoverflow.com/questions/21772271/unicodedecodeerror-when-performing-os-walk
-    for root, dirs, files in os.walk(text_type(root_dir_str)):
+    for root, dirs, files in os.walk(const.text_type(root_dir_str)):
         # log.debug('----------')
         # log.debug('root = {}'.format(root))
         # log.debug('dirs = {}'.format(text_type(dirs)))
@@ -474,26 +602,29 @@ def file_cache_add_dir(dir_str, verbose = True):
             # if dir_str is like '/example/dir' it will be present.
             if cache_file.startswith('/'): cache_file = cache_file[1:]
             file_list.append(cache_file)
-    file_set = set(file_list)
+    # The cache of a directory is a dictionary with the file names with no extension as keys
+    # and the set of extensions of every name as values, so a search is a single dictionary
+    # lookup regardless of the number of extensions searched.
+    # Files with no extension can never be found and are not stored.
+    noext_dic = {}
+    for cache_file in file_list:
+        filename_noext, dot, ext = cache_file.rpartition('.')
+        if not dot: continue
+        noext_dic.setdefault(filename_noext, set()).add(ext)
     if verbose:
-        # for file in file_set: log.debug('File "{}"'.format(file))
-        log.debug('file_cache_add_dir() Adding {} files to cache'.format(len(file_set)))
-    file_cache[dir_str] = file_set
+        log.debug('file_cache_add_dir() Adding {} files to cache'.format(len(file_list)))
+    file_cache[dir_str] = noext_dic
 
 # See utils_look_for_file() documentation below.
 def file_cache_search(dir_str, filename_noext, file_exts):
     # Check for empty, unconfigured dirs
     if not dir_str: return None
-    current_cache_set = file_cache[dir_str]
-    # if filename_noext == '005':
-    #     log.debug('file_cache_search() Searching in "{}"'.format(dir_str))
-    #     log.debug('file_cache_search() current_cache_set "{}"'.format(text_type(current_cache_set)))
+    ext_set = file_cache[dir_str].get(filename_noext)
+    if not ext_set: return None
+    # file_exts is sorted by priority so it must be iterated.
     for ext in file_exts:
-        file_base = filename_noext + '.' + ext
-        # log.debug('file_cache_search() file_Base = "{}"'.format(file_base))
-        if file_base in current_cache_set:
-            # log.debug('file_cache_search() Found in cache')
-            return FileName(dir_str).pjoin(file_base)
+        if ext in ext_set:
+            return FileName(dir_str).pjoin(filename_noext + '.' + ext)
     return None
 
 # Given the image path, image filename with no extension and a list of file
@@ -595,7 +726,7 @@ def restore_screensaver():
 # }
 #
 def json_rpc_dict(method_str, params_dic, verbose = False):
-    params_str = json.dumps(params_dic)
+    params_str = fastjson.dumps(params_dic)
     if verbose:
         log.debug('json_rpc_dict() method_str "{}"'.format(method_str))
         log.debug('json_rpc_dict() params_dic = \n{}'.format(pprint.pformat(params_dic)))
@@ -607,7 +738,7 @@ def json_rpc_dict(method_str, params_dic, verbose = False):
     response_json_str = xbmc.executeJSONRPC(query_str)
 
     # --- Parse JSON response ---
-    response_dic = json.loads(response_json_str)
+    response_dic = fastjson.loads(response_json_str)
     if 'error' in response_dic:
         result_dic = response_dic['error']
         log.warning('json_rpc_dict() JSONRPC ERROR {}'.format(result_dic['message']))